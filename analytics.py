@@ -0,0 +1,179 @@
+# 📐 Обчислення секцій дашборду (без Streamlit — використовується і в app.py, і в snapshot.py)
+import os
+
+import numpy as np
+import pandas as pd
+from scipy.stats import chi2_contingency
+
+# Шлях до даних можна підмінити змінною оточення (наприклад, синтетичний набір для навантажувального тесту)
+DATA_PATH = os.environ.get(
+    "DASHBOARD_DATA_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "shopping_behavior_csv.csv")
+)
+
+# 🔹 Значення віджетів за замовчуванням
+METRIC_COUNT = "Кількість покупок"
+METRIC_AMOUNT = "Сума покупок (USD)"
+DEFAULT_TOP_N = 5
+
+# 🔹 Колонки для теплової карти взаємозв’язків
+CORR_COLS = [
+    "Age", "Gender", "Item Purchased", "Category", "Purchase Amount (USD)",
+    "Location", "Size", "Color", "Season", "Review Rating",
+    "Subscription Status", "Shipping Type", "Discount Applied",
+    "Promo Code Used", "Previous Purchases", "Payment Method",
+    "Frequency of Purchases"
+]
+
+# 🔹 Вікові групи: 18–23, 24–29, ..., 72–77
+AGE_BINS = [18, 24, 30, 36, 42, 48, 54, 60, 66, 72, 78]  # верхня межа +1
+AGE_LABELS = [
+    "18–23", "24–29", "30–35", "36–41", "42–47",
+    "48–53", "54–59", "60–65", "66–71", "72–77"
+]
+
+# 🔹 Словник скорочень штатів
+STATE_NAME_TO_CODE = {
+    "Alabama": "AL", "Alaska": "AK", "Arizona": "AZ", "Arkansas": "AR", "California": "CA",
+    "Colorado": "CO", "Connecticut": "CT", "Delaware": "DE", "Florida": "FL", "Georgia": "GA",
+    "Hawaii": "HI", "Idaho": "ID", "Illinois": "IL", "Indiana": "IN", "Iowa": "IA",
+    "Kansas": "KS", "Kentucky": "KY", "Louisiana": "LA", "Maine": "ME", "Maryland": "MD",
+    "Massachusetts": "MA", "Michigan": "MI", "Minnesota": "MN", "Mississippi": "MS", "Missouri": "MO",
+    "Montana": "MT", "Nebraska": "NE", "Nevada": "NV", "New Hampshire": "NH", "New Jersey": "NJ",
+    "New Mexico": "NM", "New York": "NY", "North Carolina": "NC", "North Dakota": "ND", "Ohio": "OH",
+    "Oklahoma": "OK", "Oregon": "OR", "Pennsylvania": "PA", "Rhode Island": "RI", "South Carolina": "SC",
+    "South Dakota": "SD", "Tennessee": "TN", "Texas": "TX", "Utah": "UT", "Vermont": "VT",
+    "Virginia": "VA", "Washington": "WA", "West Virginia": "WV", "Wisconsin": "WI", "Wyoming": "WY"
+}
+
+
+def read_dataset(path=DATA_PATH):
+    return pd.read_csv(path)
+
+
+def data_version(path=DATA_PATH):
+    """Версія набору даних для ключів кешу: (mtime_ns, розмір файлу)."""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def apply_drill(data, drill):
+    """Звужує дані за деталізацією з графіків: кортеж пар (колонка, значення)."""
+    if not drill:
+        return data
+    return data[np.logical_and.reduce([data[column].to_numpy() == value for column, value in drill])]
+
+
+# 🎯 Розбір точок із виділення на графіках (st.plotly_chart(on_select=...)) у деталізацію
+STATE_CODE_TO_NAME = {code: name for name, code in STATE_NAME_TO_CODE.items()}
+
+
+def treemap_drill(point):
+    """Плитка TreeMap: мітка має вигляд «Категорія<br>12.3%»."""
+    label = point.get("label")
+    return {"Category": label.split("<br>")[0]} if label else {}
+
+
+def map_drill(point):
+    """Штат на карті: код із choropleth (location) або з підпису scattergeo (text)."""
+    code = point.get("location") or point.get("text")
+    return {"Location": STATE_CODE_TO_NAME[code]} if code in STATE_CODE_TO_NAME else {}
+
+
+# 🌳 TreeMap: покупки по категоріях
+def category_treemap(filtered_df):
+    category_counts = filtered_df["Category"].value_counts()
+    category_pct = (category_counts / category_counts.sum() * 100).round(1)
+    return pd.DataFrame({
+        "Category": category_counts.index,
+        "Count": category_counts.values,
+        "Label": [f"{cat}<br>{pct:.1f}%" for cat, pct in zip(category_counts.index, category_pct)]
+    })
+
+
+# 👥 Відсотки жінок і чоловіків
+def gender_shares(filtered_df):
+    gender_counts = filtered_df["Gender"].value_counts(normalize=True) * 100
+    return round(gender_counts.get("Female", 0), 1), round(gender_counts.get("Male", 0), 1)
+
+
+# 🔥 Cramér’s V (підтримує будь-які категоріальні змінні)
+def cramers_v(x, y):
+    confusion_matrix = pd.crosstab(x, y)
+    chi2 = chi2_contingency(confusion_matrix)[0]
+    n = confusion_matrix.sum().sum()
+    phi2 = chi2 / n
+    r, k = confusion_matrix.shape
+    phi2corr = max(0, phi2 - ((k-1)*(r-1))/(n-1))
+    rcorr = r - ((r-1)**2)/(n-1)
+    kcorr = k - ((k-1)**2)/(n-1)
+    return np.sqrt(phi2corr / min((kcorr-1), (rcorr-1)))
+
+
+def correlation_matrix(data, cols=CORR_COLS):
+    df_corr = data[list(cols)].dropna()
+    # Колонка з одним значенням (після деталізації чи фільтрів) не має визначеного Cramér’s V
+    cols = [col for col in cols if df_corr[col].nunique() > 1]
+    corr_matrix = pd.DataFrame(index=cols, columns=cols, dtype=float)
+    for c1 in cols:
+        for c2 in cols:
+            if c1 == c2:
+                corr_matrix.loc[c1, c2] = 1.0
+            else:
+                corr_matrix.loc[c1, c2] = cramers_v(df_corr[c1].astype(str), df_corr[c2].astype(str))
+    return corr_matrix
+
+
+# 🔀 Sankey: Gender → Category → Season
+def sankey_counts(filtered_df):
+    return filtered_df.groupby(["Gender", "Category", "Season"]).size().reset_index(name="count")
+
+
+# 🧍‍♂️🧍‍♀️ Стать × Товар (довгий формат)
+def gender_item_values(data, metric):
+    if metric == METRIC_COUNT:
+        return (
+            data.groupby(["Gender", "Item Purchased"])
+                .size()
+                .reset_index(name="Value")
+        )
+    return (
+        data.groupby(["Gender", "Item Purchased"])["Purchase Amount (USD)"]
+            .sum()
+            .reset_index(name="Value")
+    )
+
+
+# 🔥 Heatmap: Товар × Стать, відсортовано за загальним внеском
+def gender_item_pivot(filtered_df, metric):
+    heatmap_df = gender_item_values(filtered_df, metric)
+    heatmap_pivot = heatmap_df.pivot(
+        index="Item Purchased",
+        columns="Gender",
+        values="Value"
+    ).fillna(0)
+    heatmap_pivot["Total"] = heatmap_pivot.sum(axis=1)
+    return heatmap_pivot.sort_values("Total", ascending=False).drop(columns="Total")
+
+
+# 🗺️ Сума покупок по штатах
+def location_totals(filtered_df):
+    location_sum = filtered_df.groupby("Location")["Purchase Amount (USD)"].sum().reset_index()
+    location_sum.columns = ["StateName", "Total Purchase"]
+    location_sum["State"] = location_sum["StateName"].map(STATE_NAME_TO_CODE)
+    return location_sum.dropna(subset=["State"])
+
+
+# 📊 Сума покупок за віковими групами (у порядку груп)
+def age_group_totals(filtered_df):
+    # Окрема серія, щоб не змінювати спільний df
+    age_group = pd.cut(filtered_df["Age"], bins=AGE_BINS, labels=AGE_LABELS, right=False).rename("Age Group")
+    age_group_sum = (
+        filtered_df.groupby(age_group, observed=True)["Purchase Amount (USD)"]
+        .sum()
+        .round(2)
+        .reset_index()
+        .dropna()
+    )
+    age_group_sum["SortIndex"] = age_group_sum["Age Group"].apply(lambda x: AGE_LABELS.index(str(x)))
+    return age_group_sum.sort_values("SortIndex", ascending=True).drop(columns="SortIndex")
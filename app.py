@@ -1,20 +1,76 @@
+from functools import partial
+
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import numpy as np
-import plotly.graph_objects as go
-import plotly.express as px
+import plotly.io as pio
+
+import analytics
+import charts
+import memory
+import segments
+import snapshot
 
 # 🔧 Налаштування сторінки Streamlit
 st.set_page_config(page_title="🛍️ Shopping Behavior Dashboard", layout="wide")
 
 # 📥 Завантаження даних
-@st.cache_data
-def load_data():
-    return pd.read_csv("shopping_behavior_csv.csv")
-
-df = load_data()
+# Версія набору даних (mtime, розмір) — ключ кешів: зміна CSV інвалідує дані та знімок.
+# cache_resource віддає всім сесіям один і той самий DataFrame без копіювання —
+# тому df ніде не змінюється на місці
+
+# 📸 Знімок вигляду за замовчуванням, спільний для всіх сесій процесу
+@st.cache_resource
+def load_default_view(version):
+    return snapshot.load_or_build()
+
+# 🧠 Дані сесій у межах бюджету, спільні для всіх сесій процесу: розмір, (за потреби) вибірка
+# і сегменти клієнтів рахуються один раз на версію даних. Сегменти (моделі k-means) навчаються
+# на повному наборі, а в пам'яті лишається тільки те, з чим працюють сесії — повний df
+# звільняється, якщо його замінила вибірка. max_entries=1: попередня версія даних не тримається
+@st.cache_resource(max_entries=1)
+def load_session_data(version, budget):
+    df = analytics.read_dataset()
+    customers = segments.segment_customers(df)
+    row_segment = df["Customer ID"].map(customers["Segment"])
+    df_bytes = memory.object_bytes(df)
+    df, sampled = memory.sample_to_budget(df, budget, nbytes=df_bytes)
+    if sampled:
+        row_segment = row_segment.loc[df.index]
+        df_bytes = memory.object_bytes(df)
+    memory.register_shared("df", df_bytes)
+    return df, customers, row_segment, sampled, df_bytes
+
+# 🧠 Режим деградації: вибірка вдвічі меншого бюджету з уже завантажених даних сесій.
+# Один запис на весь процес — його очищають одразу, щойно процес повертається в бюджет
+DEGRADED_DATA = "df_degraded"
+
+@st.cache_resource(max_entries=1)
+def load_degraded_data(version, budget):
+    df, customers, row_segment, sampled, df_bytes = load_session_data(version, budget)
+    degraded_df, degraded = memory.sample_to_budget(df, budget // 2, nbytes=df_bytes)
+    if not degraded:
+        return df, customers, row_segment, sampled, df_bytes
+    degraded_bytes = memory.object_bytes(degraded_df)
+    memory.register_shared(DEGRADED_DATA, degraded_bytes)
+    return degraded_df, customers, row_segment.loc[degraded_df.index], True, degraded_bytes
+
+data_version = analytics.data_version()
+
+# 🧠 Облік пам'яті сесії та контроль бюджету
+if "memory_ledger" not in st.session_state:
+    st.session_state.memory_ledger = memory.MemoryLedger()
+ledger = st.session_state.memory_ledger
+ledger.start_run()
+
+session_budget = memory.budget_mb(memory.SESSION_BUDGET_ENV, memory.DEFAULT_SESSION_BUDGET_MB)
+# st.cache_data тримає лише похідні агрегати секцій; спільні дані (cache_resource) не виселяються
+if memory.enforce_process_budget(st.cache_data.clear):
+    # Процес понад бюджетом навіть після очищення кешів — зменшуємо долю сесії вдвічі
+    df, customers, row_segment, ledger.sampled, df_bytes = load_degraded_data(data_version, session_budget)
+else:
+    if memory.unregister_shared(DEGRADED_DATA):
+        # Процес повернувся в бюджет — вибірка режиму деградації більше нікому не потрібна
+        load_degraded_data.clear()
+    df, customers, row_segment, ledger.sampled, df_bytes = load_session_data(data_version, session_budget)
 
 # 🏷️ Заголовок дашборду
 st.title("🛍️ Shopping Behavior Dashboard")
@@ -57,694 +113,509 @@ discount = multi_filter("Знижка застосована", "Discount Applied
 promo = multi_filter("Промокод використано", "Promo Code Used")
 payment = multi_filter("Спосіб оплати", "Payment Method")
 frequency = multi_filter("Частота покупок", "Frequency of Purchases")
+segment_options = segments.CLUSTER_NAMES
+segment = st.sidebar.multiselect("Сегмент клієнта", options=segment_options, default=segment_options)
 
 # 🔄 Застосування фільтрів до DataFrame
-filtered_df = df.copy()
-filtered_df = filtered_df[(filtered_df["Age"] >= age_range[0]) & (filtered_df["Age"] <= age_range[1])]
-filtered_df = filtered_df[(filtered_df["Review Rating"] >= rating_range[0]) & (filtered_df["Review Rating"] <= rating_range[1])]
-filtered_df = filtered_df[filtered_df["Gender"].isin(gender)]
-filtered_df = filtered_df[filtered_df["Item Purchased"].isin(item)]
-filtered_df = filtered_df[filtered_df["Category"].isin(category)]
-filtered_df = filtered_df[filtered_df["Location"].isin(location)]
-filtered_df = filtered_df[filtered_df["Size"].isin(size)]
-filtered_df = filtered_df[filtered_df["Color"].isin(color)]
-filtered_df = filtered_df[filtered_df["Season"].isin(season)]
-filtered_df = filtered_df[filtered_df["Subscription Status"].isin(subscription)]
-filtered_df = filtered_df[filtered_df["Shipping Type"].isin(shipping)]
-filtered_df = filtered_df[filtered_df["Discount Applied"].isin(discount)]
-filtered_df = filtered_df[filtered_df["Promo Code Used"].isin(promo)]
-filtered_df = filtered_df[filtered_df["Payment Method"].isin(payment)]
-filtered_df = filtered_df[filtered_df["Frequency of Purchases"].isin(frequency)]
-
-
-
-# 🌳 TreeMap: Покупки по категоріях з підписами всередині
-st.subheader("🌳 Покупки по категоріях (TreeMap)")
-st.markdown("""
-Ця візуалізація показує розподіл покупок по категоріях у вигляді прямокутників, 
-де площа кожного елемента відповідає кількості покупок.
-""")
-
-# 🔹 Підготовка даних
-category_counts = filtered_df["Category"].value_counts()
-category_pct = (category_counts / category_counts.sum() * 100).round(1)
-df_treemap = pd.DataFrame({
-    "Category": category_counts.index,
-    "Count": category_counts.values,
-    "Label": [f"{cat}<br>{pct:.1f}%" for cat, pct in zip(category_counts.index, category_pct)]
-})
-
-# 🔹 Побудова TreeMap
-fig_tree = px.treemap(
-    df_treemap,
-    path=["Label"],
-    values="Count",
-    color="Count",
-    color_continuous_scale="Blues",
-    title="TreeMap: Покупки по категоріях"
+# Одна булева маска замість ланцюжка проміжних копій; без активних фільтрів працюємо прямо з df
+mask = (
+    df["Age"].between(age_range[0], age_range[1])
+    & df["Review Rating"].between(rating_range[0], rating_range[1])
+    & df["Gender"].isin(gender)
+    & df["Item Purchased"].isin(item)
+    & df["Category"].isin(category)
+    & df["Location"].isin(location)
+    & df["Size"].isin(size)
+    & df["Color"].isin(color)
+    & df["Season"].isin(season)
+    & df["Subscription Status"].isin(subscription)
+    & df["Shipping Type"].isin(shipping)
+    & df["Discount Applied"].isin(discount)
+    & df["Promo Code Used"].isin(promo)
+    & df["Payment Method"].isin(payment)
+    & df["Frequency of Purchases"].isin(frequency)
+    & row_segment.isin(segment)
 )
-
-# 🔹 Зміна розміру шрифту
-fig_tree.update_traces(
-    insidetextfont=dict(size=16)  # Можеш змінити на 20, 24 тощо
+filtered_df = df if mask.all() else df[mask]
+if filtered_df is not df:
+    # Оцінка пропорційно до частки рядків: deep-підрахунок на кожен перезапуск надто дорогий
+    ledger.record("filtered_df", df_bytes * len(filtered_df) / max(len(df), 1))
+
+# 📸 Без активних фільтрів (і не в режимі вибірки) секції беремо з готового знімка
+default_view = load_default_view(data_version) if filtered_df is df and not ledger.sampled else None
+
+# 🔑 Ключ стану фільтрів для кешу агрегатів (порядок вибраних значень не важливий)
+data_key = (data_version, len(df))
+filter_key = (
+    *data_key, age_range, rating_range,
+    *(tuple(sorted(values)) for values in (
+        gender, item, category, location, size, color, season, subscription,
+        shipping, discount, promo, payment, frequency, segment
+    ))
 )
 
-# 🔹 Вивід у Streamlit
-st.plotly_chart(fig_tree, use_container_width=True)
 
+# ⚡ Агрегати секцій
+SECTIONS = {
+    "treemap": analytics.category_treemap,
+    "gender_shares": analytics.gender_shares,
+    "corr_matrix": analytics.correlation_matrix,
+    "sankey": analytics.sankey_counts,
+    "gender_item": analytics.gender_item_values,
+    "heatmap_pivot": analytics.gender_item_pivot,
+    "location_sum": analytics.location_totals,
+    "age_group_sum": analytics.age_group_totals,
+    "segment_summary": partial(segments.segment_summary, customers),
+}
 
+# Кеш спільний для всіх сесій; DataFrame не хешується — його однозначно визначають filter_key і drill
+@st.cache_data(max_entries=512, show_spinner=False)
+def section_data(name, filter_key, drill, _data, args=()):
+    return SECTIONS[name](analytics.apply_drill(_data, drill), *args)
 
+# 🖼️ Теплові карти matplotlib рендеряться в PNG під тим самим ключем, що й їхні агрегати:
+# секція, дані якої не змінились, не рендериться вдруге
+IMAGES = {
+    "corr_matrix": lambda corr_matrix, cols: charts.correlation_heatmap_png(corr_matrix),
+    "heatmap_pivot": charts.gender_item_heatmap_png,
+}
 
+@st.cache_data(max_entries=128, show_spinner=False)
+def section_image(name, filter_key, drill, _data, args=()):
+    return IMAGES[name](section_data(name, filter_key, drill, _data, args), *args)
 
-# 👥 Візуалізація розподілу статі з силуетами
-st.subheader("👥 Розподіл статі")
-st.markdown("""
-Ця візуалізація показує співвідношення між чоловіками та жінками серед покупців 
-у більш емоційній формі — через силуети. Це дозволяє краще сприймати дані 
-і створює візуальний зв’язок із аудиторією.
-""")
+# TOP / BOTTOM будуються за всім df, тож залежать лише від даних, метрики й TOP_N
+@st.cache_data(max_entries=64, show_spinner=False)
+def top_bottom_figures(data_key, metric, top_n, _grouped):
+    return charts.top_bottom_figures(_grouped, metric, top_n)
 
-# 🔹 Підрахунок відсотків
-gender_counts = filtered_df["Gender"].value_counts(normalize=True) * 100
-female_pct = round(gender_counts.get("Female", 0), 1)
-male_pct = round(gender_counts.get("Male", 0), 1)
 
-# 🔹 HTML-блок з вирівнюванням і стилями
-st.markdown(f"""
-<div style="display: flex; justify-content: center; align-items: center; gap: 20mm;">
-  
-  <!-- Лівий підпис -->
-  <div style="text-align: right;">
-    <h2 style="color: red; margin-right: 10px;">{female_pct}%</h2>
-  </div>
+# 🎯 Деталізація кліками по графіках: {колонка: (значення, графік-джерело)}
+if "drill" not in st.session_state:
+    st.session_state.drill = {}
+    st.session_state.drill_generation = 0
 
-  <!-- Силует жінки -->
-  <div>
-    <img src="https://raw.githubusercontent.com/vitalii-84/Shopping-Behavior/main/woman3.jpg" width="260"/>
-  </div>
+# Деталізація, якої вже немає серед відфільтрованих даних (наприклад, штат прибрали з бічної панелі), скидається
+stale = [
+    column for column, (value, _) in st.session_state.drill.items()
+    if not (filtered_df[column] == value).any()
+]
+if stale:
+    st.session_state.drill = {column: value for column, value in st.session_state.drill.items() if column not in stale}
+    st.session_state.drill_generation += 1
+
+def chart_key(chart):
+    # Нове покоління ключів скидає виділення на графіках після «Скинути деталізацію»
+    return f"{chart}_select_{st.session_state.drill_generation}"
+
+def select_drill(chart, parse):
+    state = st.session_state.get(chart_key(chart))
+    points = state.selection.points if state else []
+    drill = {column: value for column, value in st.session_state.drill.items() if value[1] != chart}
+    for point in points:
+        drill.update({column: (value, chart) for column, value in parse(point).items()})
+    st.session_state.drill = drill
+
+def select_value(column, key):
+    # Перемикачі під Sankey: значення або None (зняте виділення)
+    value = st.session_state.get(key)
+    drill = {c: v for c, v in st.session_state.drill.items() if c != column}
+    if value is not None:
+        drill[column] = (value, "sankey")
+    st.session_state.drill = drill
+
+def reset_drill():
+    st.session_state.drill = {}
+    st.session_state.drill_generation += 1
+
+def current_drill(source=None):
+    # Графік-джерело не фільтрується власним виділенням, щоб лишались видимі альтернативи
+    return tuple(sorted(
+        (column, value) for column, (value, chart) in st.session_state.drill.items() if chart != source
+    ))
+
+# 📸 Вигляд за замовчуванням (без фільтрів, деталізації й змін віджетів) — зі знімка:
+# агрегати, PNG теплових карт і JSON фігур plotly вже готові
+def from_snapshot(source=None, use_snapshot=True):
+    return bool(default_view) and use_snapshot and not current_drill(source)
+
+def section(name, *args, source=None, use_snapshot=True):
+    if from_snapshot(source, use_snapshot):
+        return default_view["sections"][name]
+    return section_data(name, filter_key, current_drill(source), filtered_df, args)
+
+def section_png(name, *args, use_snapshot=True):
+    if from_snapshot(use_snapshot=use_snapshot):
+        return default_view["images"][name]
+    return section_image(name, filter_key, current_drill(), filtered_df, args)
+
+def section_figure(name, build, data, source=None):
+    if from_snapshot(source):
+        return pio.from_json(default_view["figures"][name])
+    return build(data)
+
+def snapshot_figures(*names):
+    return [pio.from_json(default_view["figures"][name]) for name in names]
+
+
+# 🧩 Фрагменти: кожен перезапускає лише свої секції, а не завантаження даних, бічну панель
+# і маску фільтрів. filtered_df, filter_key і default_view — з останнього повного прогону,
+# у якому фрагмент і викликався.
+#   drill_sections              — клік по графіку чи перемикач деталізації: секції, що залежать від деталізації
+#   ├─ top_bottom_section       — metric і TOP_N: лише TOP / BOTTOM графіки
+#   └─ gender_item_heatmap_section — heatmap_metric: лише теплова карта Стать × Товар
+
+@st.fragment
+def top_bottom_section():
+    st.subheader("🧍‍♂️🧍‍♀️ Gender Analysis: Purchased Items")
+
+    st.markdown("""
+    - TOP-графік автоматично відсортований від найбільш значущих товарів до менш значущих
+    - BOTTOM-графік показує найменш популярні або найменш прибуткові позиції
+    - Сортування оновлюється динамічно при зміні метрики або кількості товарів
+    """)
+
+    # ==============================
+    # НАЛАШТУВАННЯ КОРИСТУВАЧА
+    # ==============================
+
+    metric = st.radio(
+        "Оберіть метрику для аналізу:",
+        (analytics.METRIC_COUNT, analytics.METRIC_AMOUNT),
+        horizontal=True
+    )
 
-  <!-- Силует чоловіка -->
-  <div>
-    <img src="https://raw.githubusercontent.com/vitalii-84/Shopping-Behavior/main/man3.jpg" width="260"/>
-  </div>
+    TOP_N = st.slider(
+        "Оберіть кількість товарів (Top / Bottom)",
+        min_value=3,
+        max_value=10,
+        value=analytics.DEFAULT_TOP_N
+    )
 
-  <!-- Правий підпис -->
-  <div style="text-align: left;">
-    <h2 style="color: blue; margin-left: 10px;">{male_pct}%</h2>
-  </div>
+    # ==============================
+    # ПІДГОТОВКА ДАНИХ
+    # ==============================
+
+    if default_view and metric == analytics.METRIC_COUNT:
+        grouped = default_view["sections"]["gender_item"]
+    else:
+        grouped = section_data("gender_item", data_key, (), df, (metric,))
+
+    ledger.track("grouped", grouped)
+
+    # ==============================
+    # ВІЗУАЛІЗАЦІЯ: TOP (↓ спадання) і BOTTOM (↑ зростання)
+    # ==============================
+
+    if default_view and metric == analytics.METRIC_COUNT and TOP_N == analytics.DEFAULT_TOP_N:
+        fig_top, fig_bottom = snapshot_figures("top", "bottom")
+    else:
+        fig_top, fig_bottom = top_bottom_figures(data_key, metric, TOP_N, grouped)
+    st.plotly_chart(fig_top, use_container_width=True)
+    st.plotly_chart(fig_bottom, use_container_width=True)
+
+    # ==============================
+    # АНАЛІТИЧНИЙ ВИСНОВОК
+    # ==============================
+
+    st.info("""
+    📌 **Висновки за візуалізацією (Gender × Item Purchased)**
+
+    - TOP-графік демонструє товари, які формують основний попит та/або дохід магазину, з чітко помітними гендерними відмінностями.
+    - Для окремих товарів спостерігається виражена орієнтація на одну зі статей, що свідчить про різні купівельні вподобання чоловіків і жінок.
+    - BOTTOM-графік дозволяє ідентифікувати товари з найнижчим попитом або мінімальним фінансовим внеском незалежно від статі.
+    - Перемикання між метриками (кількість покупок ↔ сума покупок) показує, що не всі популярні товари є фінансово найефективнішими, і навпаки.
+
+    💼 **Бізнес-рекомендації**
+
+    - Для TOP-товарів з чіткою гендерною перевагою доцільно застосовувати персоналізований маркетинг 
+      (таргетовані акції, email-розсилки, банери з урахуванням статі).
+    - Товари з високою кількістю покупок, але низькою сумарною вартістю можна використовувати як 
+      «вхідні» продукти для крос-продажів або апселінгу.
+    - Товари з BOTTOM-сегменту варто переглянути з точки зору:
+      – доцільності збереження в асортименті,
+      – зміни ціни або промо-підтримки,
+      – сезонності або неправильного позиціонування.
+    - Отримані інсайти можуть бути використані для оптимізації асортименту та підвищення середнього чеку.
+    """)
+
+
+@st.fragment
+def gender_item_heatmap_section():
+    # 🔥 Heatmap: Gender × Item Purchased
+    st.subheader("🔥 Теплова карта: Стать × Товар")
+    st.markdown("""
+    Ця теплова карта показує, які товари частіше купують чоловіки та жінки.
+    Інтенсивність кольору відображає або **кількість покупок**, або **загальну суму покупок**.
+    """)
+
+    # 🔘 Перемикач метрики
+    heatmap_metric = st.radio(
+        "Оберіть метрику для теплової карти:",
+        [analytics.METRIC_COUNT, analytics.METRIC_AMOUNT],
+        horizontal=True
+    )
 
-</div>
-""", unsafe_allow_html=True)
+    # 🔹 Агрегація даних і pivot-таблиця (товари відсортовані за загальним внеском)
+    heatmap_pivot = section("heatmap_pivot", heatmap_metric, use_snapshot=heatmap_metric == analytics.METRIC_COUNT)
+    ledger.track("heatmap_pivot", heatmap_pivot)
 
+    # 🔹 Теплова карта (PNG з кешу, якщо дані й метрика не змінились)
+    st.image(
+        section_png("heatmap_pivot", heatmap_metric, use_snapshot=heatmap_metric == analytics.METRIC_COUNT),
+        width="stretch"
+    )
 
 
+@st.fragment
+def drill_sections():
+    # 🎯 Активна деталізація
+    if st.session_state.drill:
+        active = ", ".join(f"{column} = {value}" for column, (value, _) in st.session_state.drill.items())
+        st.info(f"🎯 Деталізація: {active}")
+        st.button("✖ Скинути деталізацію", on_click=reset_drill)
+
+    # Разом фільтри й деталізація можуть не залишити жодного рядка — секції тоді не будуються
+    if analytics.apply_drill(filtered_df, current_drill()).empty:
+        st.warning("⚠️ За обраними фільтрами та деталізацією немає жодної покупки.")
+        return
+
+    # 🌳 TreeMap: Покупки по категоріях з підписами всередині
+    st.subheader("🌳 Покупки по категоріях (TreeMap)")
+    st.markdown("""
+    Ця візуалізація показує розподіл покупок по категоріях у вигляді прямокутників, 
+    де площа кожного елемента відповідає кількості покупок.
+    """)
+
+    # 🔹 Підготовка даних
+    df_treemap = section("treemap", source="treemap")
+
+    # 🔹 Побудова TreeMap
+    fig_tree = section_figure("treemap", charts.treemap_figure, df_treemap, source="treemap")
+
+    # 🔹 Вивід у Streamlit (клік по категорії фільтрує решту секцій)
+    st.plotly_chart(
+        fig_tree,
+        use_container_width=True,
+        key=chart_key("treemap"),
+        on_select=partial(select_drill, "treemap", analytics.treemap_drill),
+        selection_mode="points"
+    )
 
-# 🔥 Теплова карта взаємозв’язків (підтримує і категоріальні, і числові змінні)
-st.subheader("📊 Теплова карта взаємозв’язків між змінними")
-st.markdown("""
-Ця теплова карта показує силу взаємозв’язків між змінними, включно з категоріальними (наприклад, стать, категорія товару, спосіб оплати).
-Для оцінки зв’язків використовується коефіцієнт **Cramér’s V**, який підходить для якісних ознак.
-""")
 
-from scipy.stats import chi2_contingency
-import numpy as np
-import seaborn as sns
-import matplotlib.pyplot as plt
 
-# 🔹 Вибір колонок для аналізу
-cols = [
-    "Age", "Gender", "Item Purchased", "Category", "Purchase Amount (USD)",
-    "Location", "Size", "Color", "Season", "Review Rating",
-    "Subscription Status", "Shipping Type", "Discount Applied",
-    "Promo Code Used", "Previous Purchases", "Payment Method",
-    "Frequency of Purchases"
-]
 
-df_corr = filtered_df[cols].dropna()
-
-# 🔹 Функція для обчислення Cramér’s V (підтримує будь-які категоріальні змінні)
-def cramers_v(x, y):
-    confusion_matrix = pd.crosstab(x, y)
-    chi2 = chi2_contingency(confusion_matrix)[0]
-    n = confusion_matrix.sum().sum()
-    phi2 = chi2 / n
-    r, k = confusion_matrix.shape
-    phi2corr = max(0, phi2 - ((k-1)*(r-1))/(n-1))
-    rcorr = r - ((r-1)**2)/(n-1)
-    kcorr = k - ((k-1)**2)/(n-1)
-    return np.sqrt(phi2corr / min((kcorr-1), (rcorr-1)))
-
-# 🔹 Побудова кореляційної матриці
-corr_matrix = pd.DataFrame(index=cols, columns=cols, dtype=float)
-
-for c1 in cols:
-    for c2 in cols:
-        if c1 == c2:
-            corr_matrix.loc[c1, c2] = 1.0
-        else:
-            corr_matrix.loc[c1, c2] = cramers_v(df_corr[c1].astype(str), df_corr[c2].astype(str))
-
-# 🔹 Візуалізація теплової карти
-fig, ax = plt.subplots(figsize=(12, 9))
-sns.heatmap(
-    corr_matrix.astype(float),
-    annot=True,
-    cmap="YlGnBu",
-    linewidths=0.5,
-    fmt=".2f",
-    annot_kws={"size": 8}
-)
-plt.title("Взаємозв’язки між змінними (Cramér’s V)", fontsize=14)
-plt.xticks(rotation=45, ha="right", fontsize=8)
-plt.yticks(fontsize=8)
-fig.tight_layout()
-st.pyplot(fig)
 
+    # 👥 Візуалізація розподілу статі з силуетами
+    st.subheader("👥 Розподіл статі")
+    st.markdown("""
+    Ця візуалізація показує співвідношення між чоловіками та жінками серед покупців 
+    у більш емоційній формі — через силуети. Це дозволяє краще сприймати дані 
+    і створює візуальний зв’язок із аудиторією.
+    """)
 
+    # 🔹 Підрахунок відсотків
+    female_pct, male_pct = section("gender_shares")
 
+    # 🔹 HTML-блок з вирівнюванням і стилями
+    st.markdown(f"""
+    <div style="display: flex; justify-content: center; align-items: center; gap: 20mm;">
 
-# 🔀 Sankey Diagram: Gender → Category → Season
-st.subheader("🔀 Потік покупок: Gender → Category → Season")
-st.markdown("""
-Ця діаграма показує, як стать покупця впливає на вибір категорії товару, 
-а потім — на сезон покупки. Це допомагає виявити поведінкові патерни.
-""")
+      <!-- Лівий підпис -->
+      <div style="text-align: right;">
+        <h2 style="color: red; margin-right: 10px;">{female_pct}%</h2>
+      </div>
 
-# 📘 Легенда кольорів потоків
-st.markdown("""
-<style>
-.legend-box {
-    display: flex;
-    align-items: center;
-    margin-bottom: 6px;
-}
-.color-square {
-    width: 16px;
-    height: 16px;
-    margin-right: 8px;
-    display: inline-block;
-    border: 1px solid #333;
-}
-</style>
-
-<div class="legend-box">
-  <span class="color-square" style="background-color: rgba(173,216,230,0.6);"></span>
-  <span>Світло-голубий — <b>Найбільш помітні потоки</b></span>
-</div>
-<div class="legend-box">
-  <span class="color-square" style="background-color: rgba(255,255,153,0.6);"></span>
-  <span>Світло-жовтий — <b>Сезонний зв’язок</b></span>
-</div>
-<div class="legend-box">
-  <span class="color-square" style="background-color: rgba(255,182,193,0.6);"></span>
-  <span>Світло-червоний — <b>Несподівано малий потік</b></span>
-</div>
-""", unsafe_allow_html=True)
-
-import plotly.graph_objects as go
-import colorsys
-import pandas as pd
-
-if all(col in filtered_df.columns for col in ["Gender", "Category", "Season"]):
-    # 🔹 Групування даних
-    sankey_df = filtered_df.groupby(["Gender", "Category", "Season"]).size().reset_index(name="count")
-
-    # 🔹 Унікальні мітки для вузлів
-    all_labels = pd.concat([sankey_df["Gender"], sankey_df["Category"], sankey_df["Season"]]).unique().tolist()
-    label_to_index = {label: i for i, label in enumerate(all_labels)}
-
-    # 🔹 Потоки: Gender → Category
-    source_gc = sankey_df["Gender"].map(label_to_index)
-    target_gc = sankey_df["Category"].map(label_to_index)
-    value_gc = sankey_df["count"]
-
-    # 🔹 Потоки: Category → Season
-    source_cs = sankey_df["Category"].map(label_to_index)
-    target_cs = sankey_df["Season"].map(label_to_index)
-    value_cs = sankey_df["count"]
-
-    # 🔹 Об'єднання всіх потоків
-    all_source = source_gc.tolist() + source_cs.tolist()
-    all_target = target_gc.tolist() + target_cs.tolist()
-    all_value = value_gc.tolist() + value_cs.tolist()
-
-    # 🔹 Індивідуальне призначення кольорів для потоків
-    all_color = []
-    for s, t in zip(all_source, all_target):
-        src_label = all_labels[s]
-        tgt_label = all_labels[t]
-
-        # Світло-голубий — найбільш помітні потоки
-        if (src_label == "Female" and tgt_label == "Accessories") or \
-           (src_label == "Accessories" and tgt_label == "Summer") or \
-           (src_label == "Male" and tgt_label == "Clothing") or \
-           (src_label == "Clothing" and tgt_label == "Fall"):
-            all_color.append("rgba(173,216,230,0.6)")
-
-        # Світло-жовтий — сезонний зв’язок
-        elif (src_label == "Accessories" and tgt_label == "Summer") or \
-             (src_label == "Clothing" and tgt_label == "Winter"):
-            all_color.append("rgba(255,255,153,0.6)")
-
-        # Світло-червоний — несподівано малий потік
-        elif (src_label == "Female" and tgt_label == "Footwear") or \
-             (src_label == "Footwear" and tgt_label == "Spring" and "Female" in sankey_df["Gender"].unique()):
-            all_color.append("rgba(255,182,193,0.6)")
-
-        # Інші — напівпрозорі
-        else:
-            all_color.append("rgba(150,150,150,0.3)")
-
-    # 🔹 Генерація кольорів вузлів
-    def generate_colors(n):
-        hues = [i / n for i in range(n)]
-        return [
-            f"rgba({int(r*255)}, {int(g*255)}, {int(b*255)}, 0.9)"
-            for h in hues
-            for r, g, b in [colorsys.hsv_to_rgb(h, 0.5, 0.9)]
-        ][:n]
-
-    node_colors = generate_colors(len(all_labels))
-
-    # 🔹 Побудова Sankey Diagram
-    fig3 = go.Figure(data=[go.Sankey(
-        node=dict(
-            pad=20,
-            thickness=25,
-            line=dict(color="black", width=0.8),
-            label=all_labels,
-            color=node_colors,
-            hoverlabel=dict(
-                bgcolor="white",
-                font_size=14,
-                font_color="black"
-            )
-        ),
-        link=dict(
-            source=all_source,
-            target=all_target,
-            value=all_value,
-            color=all_color
-        )
-    )])
-
-    # 🔹 Стиль діаграми
-    fig3.update_layout(
-        title=dict(
-            text="Sankey Diagram: Gender → Category → Season",
-            font=dict(size=18, color="black"),
-            x=0.5
-        ),
-        font=dict(color="black", size=15),
-        plot_bgcolor="white",
-        paper_bgcolor="white"
-    )
+      <!-- Силует жінки -->
+      <div>
+        <img src="https://raw.githubusercontent.com/vitalii-84/Shopping-Behavior/main/woman3.jpg" width="260"/>
+      </div>
 
-    # 🔹 Вивід у Streamlit
-    st.plotly_chart(fig3, use_container_width=True)
+      <!-- Силует чоловіка -->
+      <div>
+        <img src="https://raw.githubusercontent.com/vitalii-84/Shopping-Behavior/main/man3.jpg" width="260"/>
+      </div>
 
+      <!-- Правий підпис -->
+      <div style="text-align: left;">
+        <h2 style="color: blue; margin-left: 10px;">{male_pct}%</h2>
+      </div>
 
+    </div>
+    """, unsafe_allow_html=True)
 
 
 
-st.subheader("🧍‍♂️🧍‍♀️ Gender Analysis: Purchased Items")
 
-st.markdown("""
-- TOP-графік автоматично відсортований від найбільш значущих товарів до менш значущих
-- BOTTOM-графік показує найменш популярні або найменш прибуткові позиції
-- Сортування оновлюється динамічно при зміні метрики або кількості товарів
-""")
+    # 🔥 Теплова карта взаємозв’язків (підтримує і категоріальні, і числові змінні)
+    st.subheader("📊 Теплова карта взаємозв’язків між змінними")
+    st.markdown("""
+    Ця теплова карта показує силу взаємозв’язків між змінними, включно з категоріальними (наприклад, стать, категорія товару, спосіб оплати).
+    Для оцінки зв’язків використовується коефіцієнт **Cramér’s V**, який підходить для якісних ознак.
+    """)
 
-# ==============================
-# НАЛАШТУВАННЯ КОРИСТУВАЧА
-# ==============================
+    # 🔹 Кореляційна матриця (O(17²) тестів χ² — для вигляду за замовчуванням береться зі знімка).
+    # Колонка, за якою деталізовано, має одне значення — її зв’язки не визначені, тож вона не рахується
+    drilled = {column for column, _ in current_drill()}
+    corr_cols = tuple(col for col in analytics.CORR_COLS if col not in drilled)
 
-metric = st.radio(
-    "Оберіть метрику для аналізу:",
-    ("Кількість покупок", "Сума покупок (USD)"),
-    horizontal=True
-)
+    # 🔹 Візуалізація теплової карти (PNG з кешу, якщо дані не змінились)
+    st.image(section_png("corr_matrix", corr_cols), width="stretch")
 
-TOP_N = st.slider(
-    "Оберіть кількість товарів (Top / Bottom)",
-    min_value=3,
-    max_value=10,
-    value=5
-)
 
-# ==============================
-# ПІДГОТОВКА ДАНИХ
-# ==============================
 
-if metric == "Кількість покупок":
-    grouped = (
-        df.groupby(["Gender", "Item Purchased"])
-          .size()
-          .reset_index(name="Value")
-    )
-    value_label = "Number of Purchases"
-else:
-    grouped = (
-        df.groupby(["Gender", "Item Purchased"])["Purchase Amount (USD)"]
-          .sum()
-          .reset_index(name="Value")
-    )
-    value_label = "Total Purchase Amount (USD)"
-
-# Загальне значення по кожному товару (для сортування)
-total_by_item = (
-    grouped
-    .groupby("Item Purchased")["Value"]
-    .sum()
-    .sort_values(ascending=False)
-)
 
-# TOP і BOTTOM списки товарів
-top_items = total_by_item.head(TOP_N)
-bottom_items = total_by_item.tail(TOP_N)
-
-top_data = grouped[grouped["Item Purchased"].isin(top_items.index)]
-bottom_data = grouped[grouped["Item Purchased"].isin(bottom_items.index)]
-
-# ==============================
-# ВІЗУАЛІЗАЦІЯ: TOP (↓ спадання)
-# ==============================
-
-fig_top = px.bar(
-    top_data,
-    x="Item Purchased",
-    y="Value",
-    color="Gender",
-    barmode="group",
-    title=f"Top {TOP_N} товарів за показником: {metric}",
-    labels={
-        "Value": value_label,
-        "Item Purchased": "Товар",
-        "Gender": "Стать"
+    # 🔀 Sankey Diagram: Gender → Category → Season
+    st.subheader("🔀 Потік покупок: Gender → Category → Season")
+    st.markdown("""
+    Ця діаграма показує, як стать покупця впливає на вибір категорії товару, 
+    а потім — на сезон покупки. Це допомагає виявити поведінкові патерни.
+    """)
+
+    # 📘 Легенда кольорів потоків
+    st.markdown("""
+    <style>
+    .legend-box {
+        display: flex;
+        align-items: center;
+        margin-bottom: 6px;
     }
-)
+    .color-square {
+        width: 16px;
+        height: 16px;
+        margin-right: 8px;
+        display: inline-block;
+        border: 1px solid #333;
+    }
+    </style>
+
+    <div class="legend-box">
+      <span class="color-square" style="background-color: rgba(173,216,230,0.6);"></span>
+      <span>Світло-голубий — <b>Найбільш помітні потоки</b></span>
+    </div>
+    <div class="legend-box">
+      <span class="color-square" style="background-color: rgba(255,255,153,0.6);"></span>
+      <span>Світло-жовтий — <b>Сезонний зв’язок</b></span>
+    </div>
+    <div class="legend-box">
+      <span class="color-square" style="background-color: rgba(255,182,193,0.6);"></span>
+      <span>Світло-червоний — <b>Несподівано малий потік</b></span>
+    </div>
+    """, unsafe_allow_html=True)
+
+    if all(col in filtered_df.columns for col in ["Gender", "Category", "Season"]):
+        # 🔹 Групування даних
+        sankey_df = section("sankey", source="sankey")
+        ledger.track("sankey_df", sankey_df)
+
+        # 🔹 Побудова Sankey Diagram і вивід у Streamlit
+        fig3 = section_figure("sankey", charts.sankey_figure, sankey_df, source="sankey")
+        st.plotly_chart(fig3, use_container_width=True)
+
+        # 🔹 Sankey не є виділюваним трейсом, тож кліки по ньому не доходять до Streamlit —
+        # деталізацію за статтю й сезоном задають перемикачі під діаграмою
+        for container, column, label in zip(st.columns(2), ["Gender", "Season"], ["Стать", "Сезон"]):
+            key = chart_key(f"sankey_{column}")
+            value, chart = st.session_state.drill.get(column, (None, None))
+            container.segmented_control(
+                f"Деталізація: {label}",
+                options=sorted(sankey_df[column].unique()),
+                default=value if chart == "sankey" else None,
+                key=key,
+                on_change=select_value,
+                args=(column, key)
+            )
 
-# Сортування осі X від більшого до меншого
-fig_top.update_layout(
-    xaxis=dict(
-        categoryorder="array",
-        categoryarray=top_items.index.tolist()
-    ),
-    xaxis_tickangle=-45,
-    template="plotly_white"
-)
 
-st.plotly_chart(fig_top, use_container_width=True)
-
-# ==============================
-# ВІЗУАЛІЗАЦІЯ: BOTTOM (↑ зростання)
-# ==============================
-
-fig_bottom = px.bar(
-    bottom_data,
-    x="Item Purchased",
-    y="Value",
-    color="Gender",
-    barmode="group",
-    title=f"Bottom {TOP_N} товарів за показником: {metric}",
-    labels={
-        "Value": value_label,
-        "Item Purchased": "Товар",
-        "Gender": "Стать"
-    }
-)
 
-# Сортування осі X від меншого до більшого
-fig_bottom.update_layout(
-    xaxis=dict(
-        categoryorder="array",
-        categoryarray=bottom_items.sort_values().index.tolist()
-    ),
-    xaxis_tickangle=-45,
-    template="plotly_white"
-)
 
-st.plotly_chart(fig_bottom, use_container_width=True)
 
-# ==============================
-# АНАЛІТИЧНИЙ ВИСНОВОК
-# ==============================
+    top_bottom_section()
 
-st.info("""
-📌 **Висновки за візуалізацією (Gender × Item Purchased)**
 
-- TOP-графік демонструє товари, які формують основний попит та/або дохід магазину, з чітко помітними гендерними відмінностями.
-- Для окремих товарів спостерігається виражена орієнтація на одну зі статей, що свідчить про різні купівельні вподобання чоловіків і жінок.
-- BOTTOM-графік дозволяє ідентифікувати товари з найнижчим попитом або мінімальним фінансовим внеском незалежно від статі.
-- Перемикання між метриками (кількість покупок ↔ сума покупок) показує, що не всі популярні товари є фінансово найефективнішими, і навпаки.
 
-💼 **Бізнес-рекомендації**
+    gender_item_heatmap_section()
 
-- Для TOP-товарів з чіткою гендерною перевагою доцільно застосовувати персоналізований маркетинг 
-  (таргетовані акції, email-розсилки, банери з урахуванням статі).
-- Товари з високою кількістю покупок, але низькою сумарною вартістю можна використовувати як 
-  «вхідні» продукти для крос-продажів або апселінгу.
-- Товари з BOTTOM-сегменту варто переглянути з точки зору:
-  – доцільності збереження в асортименті,
-  – зміни ціни або промо-підтримки,
-  – сезонності або неправильного позиціонування.
-- Отримані інсайти можуть бути використані для оптимізації асортименту та підвищення середнього чеку.
-""")
 
 
 
-# 🔥 Heatmap: Gender × Item Purchased
-st.subheader("🔥 Теплова карта: Стать × Товар")
-st.markdown("""
-Ця теплова карта показує, які товари частіше купують чоловіки та жінки.
-Інтенсивність кольору відображає або **кількість покупок**, або **загальну суму покупок**.
-""")
+    # 🗺️ Сума покупок по штатах США
+    st.subheader("🗺️ Сума покупок по штатах США")
+    st.markdown("""
+    Ця карта показує, в яких штатах США покупці витрачають найбільше. 
+    Скорочені назви штатів допомагають швидко зорієнтуватися на мапі.
+    """)
 
-# 🔘 Перемикач метрики
-heatmap_metric = st.radio(
-    "Оберіть метрику для теплової карти:",
-    ["Кількість покупок", "Сума покупок (USD)"],
-    horizontal=True
-)
+    # 🔹 Підготовка даних
+    location_sum = section("location_sum", source="map")
+    ledger.track("location_sum", location_sum)
 
-# 🔹 Агрегація даних
-if heatmap_metric == "Кількість покупок":
-    heatmap_df = (
-        filtered_df
-        .groupby(["Item Purchased", "Gender"])
-        .size()
-        .reset_index(name="Value")
-    )
-    value_label = "Кількість покупок"
-else:
-    heatmap_df = (
-        filtered_df
-        .groupby(["Item Purchased", "Gender"])["Purchase Amount (USD)"]
-        .sum()
-        .reset_index(name="Value")
+    # 🔹 Побудова карти
+    fig_map = section_figure("location_sum", charts.location_map_figure, location_sum, source="map")
+
+    # 🔹 Вивід у Streamlit (клік по штату фільтрує решту секцій)
+    st.plotly_chart(
+        fig_map,
+        use_container_width=True,
+        key=chart_key("map"),
+        on_select=partial(select_drill, "map", analytics.map_drill),
+        selection_mode="points"
     )
-    value_label = "Сума покупок (USD)"
-
-# 🔹 Pivot-таблиця
-heatmap_pivot = heatmap_df.pivot(
-    index="Item Purchased",
-    columns="Gender",
-    values="Value"
-).fillna(0)
-
-# 🔹 Сортування товарів за загальним внеском
-heatmap_pivot["Total"] = heatmap_pivot.sum(axis=1)
-heatmap_pivot = heatmap_pivot.sort_values("Total", ascending=False).drop(columns="Total")
-
-# 🔹 Побудова heatmap
-fig, ax = plt.subplots(figsize=(6, max(6, len(heatmap_pivot) * 0.4)))
-
-sns.heatmap(
-    heatmap_pivot,
-    annot=True,
-    fmt=".0f",
-    cmap="YlOrRd",
-    linewidths=0.5,
-    cbar_kws={"label": value_label},
-    ax=ax
-)
 
-ax.set_title("Heatmap: Стать × Товар", fontsize=14)
-ax.set_xlabel("Стать")
-ax.set_ylabel("Товар")
 
-plt.tight_layout()
-st.pyplot(fig)
+    # 📊 Аналіз покупок за віковими групами
+    st.subheader("📊 Покупки за віковими групами")
+    st.markdown("""
+    Ця візуалізація показує, які вікові групи витрачають найбільше онлайн. 
+    Групи чітко визначені: 18–23, 24–29, ..., 72–77.
+    Три найактивніші групи виділені різними відтінками синього, найменш активна — червоним.
+    """)
 
+    if all(col in filtered_df.columns for col in ["Age", "Purchase Amount (USD)"]):
+        # 🔹 Агрегація суми покупок за віковими групами (18–23, 24–29, ..., 72–77)
+        age_group_sum = section("age_group_sum")
+        ledger.track("age_group_sum", age_group_sum)
 
+        # 🔹 Побудова графіка (топ-3 групи — відтінками синього, найменш активна — червоним)
+        fig_age = section_figure("age_group_sum", charts.age_group_figure, age_group_sum)
+        st.plotly_chart(fig_age, use_container_width=True)
 
 
-# 🗺️ Сума покупок по штатах США
-st.subheader("🗺️ Сума покупок по штатах США")
-st.markdown("""
-Ця карта показує, в яких штатах США покупці витрачають найбільше. 
-Скорочені назви штатів допомагають швидко зорієнтуватися на мапі.
-""")
+    # 👤 Сегментація клієнтів
+    st.subheader("👤 Сегментація клієнтів")
+    st.markdown("""
+    Клієнти згруповані методом **k-means** за віком, сумою покупок, кількістю попередніх покупок
+    і частотою покупок. Додатково кожен клієнт має **RFM-бал** (R — частота як проксі давності,
+    F — попередні покупки, M — сума покупок; кожен від 1 до 5). Сегмент можна обрати фільтром на бічній панелі.
+    """)
 
-# 🔹 Словник скорочень штатів
-state_name_to_code = {
-    "Alabama": "AL", "Alaska": "AK", "Arizona": "AZ", "Arkansas": "AR", "California": "CA",
-    "Colorado": "CO", "Connecticut": "CT", "Delaware": "DE", "Florida": "FL", "Georgia": "GA",
-    "Hawaii": "HI", "Idaho": "ID", "Illinois": "IL", "Indiana": "IN", "Iowa": "IA",
-    "Kansas": "KS", "Kentucky": "KY", "Louisiana": "LA", "Maine": "ME", "Maryland": "MD",
-    "Massachusetts": "MA", "Michigan": "MI", "Minnesota": "MN", "Mississippi": "MS", "Missouri": "MO",
-    "Montana": "MT", "Nebraska": "NE", "Nevada": "NV", "New Hampshire": "NH", "New Jersey": "NJ",
-    "New Mexico": "NM", "New York": "NY", "North Carolina": "NC", "North Dakota": "ND", "Ohio": "OH",
-    "Oklahoma": "OK", "Oregon": "OR", "Pennsylvania": "PA", "Rhode Island": "RI", "South Carolina": "SC",
-    "South Dakota": "SD", "Tennessee": "TN", "Texas": "TX", "Utah": "UT", "Vermont": "VT",
-    "Virginia": "VA", "Washington": "WA", "West Virginia": "WV", "Wisconsin": "WI", "Wyoming": "WY"
-}
+    # 🔹 Профіль сегментів серед клієнтів, що залишились після фільтрів
+    segment_profile, rfm_crosstab = section("segment_summary")
+    ledger.track("segment_profile", segment_profile)
 
-# 🔹 Координати центрів штатів (спрощено)
-state_coords = {
-    "CA": [-119.4179, 36.7783], "TX": [-99.9018, 31.9686], "NY": [-75.4999, 43.0000],
-    "FL": [-81.5158, 27.6648], "IL": [-89.3985, 40.6331], "PA": [-77.1945, 41.2033],
-    "OH": [-82.9071, 40.4173], "GA": [-82.9071, 32.1656], "NC": [-79.0193, 35.7596],
-    "MI": [-85.6024, 44.3148], "NJ": [-74.4057, 40.0583], "VA": [-78.6569, 37.4316],
-    "WA": [-120.7401, 47.7511], "AZ": [-111.0937, 34.0489], "MA": [-71.3824, 42.4072],
-    "TN": [-86.5804, 35.5175], "IN": [-86.1349, 40.2672], "MO": [-91.8318, 37.9643],
-    "WI": [-89.6165, 43.7844], "CO": [-105.7821, 39.5501], "MN": [-94.6859, 46.7296],
-    "SC": [-81.1637, 33.8361], "AL": [-86.9023, 32.3182], "LA": [-91.9623, 30.9843],
-    "KY": [-84.2700, 37.8393], "OR": [-120.5542, 43.8041], "OK": [-97.0929, 35.0078],
-    "CT": [-72.7554, 41.6032], "IA": [-93.0977, 41.8780], "MS": [-89.3985, 32.3547],
-    "AR": [-92.3731, 35.2010], "KS": [-98.4842, 39.0119], "UT": [-111.0937, 39.3200],
-    "NV": [-116.4194, 38.8026], "NM": [-105.8701, 34.5199], "NE": [-99.9018, 41.4925],
-    "WV": [-80.4549, 38.5976], "ID": [-114.7420, 44.0682], "HI": [-155.5828, 19.8968],
-    "NH": [-71.5724, 43.1939], "ME": [-69.4455, 45.2538], "RI": [-71.4774, 41.5801],
-    "MT": [-110.3626, 46.8797], "DE": [-75.5277, 38.9108], "SD": [-99.9018, 43.9695],
-    "ND": [-101.0020, 47.5515], "VT": [-72.5778, 44.5588], "AK": [-149.4937, 64.2008],
-    "WY": [-107.2903, 43.0759]
-}
+    if from_snapshot():
+        fig_segments, fig_rfm = snapshot_figures("segments", "rfm")
+    else:
+        fig_segments, fig_rfm = charts.segment_figures(segment_profile, rfm_crosstab)
+    st.plotly_chart(fig_segments, use_container_width=True)
 
-# 🔹 Підготовка даних
-location_sum = filtered_df.groupby("Location")["Purchase Amount (USD)"].sum().reset_index()
-location_sum.columns = ["StateName", "Total Purchase"]
-location_sum["State"] = location_sum["StateName"].map(state_name_to_code)
-location_sum = location_sum.dropna(subset=["State"])
-
-# 🔹 Побудова карти
-fig_map = go.Figure()
-
-# 🔸 Хлороплет
-fig_map.add_trace(go.Choropleth(
-    locations=location_sum["State"],
-    z=location_sum["Total Purchase"],
-    locationmode="USA-states",
-    colorscale="YlOrRd",
-    colorbar_title="Сума покупок ($)",
-    marker_line_color="white"
-))
-
-# 🔸 Текстові підписи
-for i, row in location_sum.iterrows():
-    code = row["State"]
-    if code in state_coords:
-        lon, lat = state_coords[code]
-        fig_map.add_trace(go.Scattergeo(
-            locationmode="USA-states",
-            lon=[lon],
-            lat=[lat],
-            text=code,
-            mode="text",
-            showlegend=False,
-            textfont=dict(color="black", size=10)
-        ))
-
-# 🔹 Оформлення
-fig_map.update_layout(
-    title_text="Сума покупок по штатах США",
-    geo=dict(scope="usa", projection=go.layout.geo.Projection(type="albers usa")),
-    margin=dict(l=0, r=0, t=50, b=0)
-)
+    st.dataframe(segment_profile, use_container_width=True)
 
-# 🔹 Вивід у Streamlit
-st.plotly_chart(fig_map, use_container_width=True)
-
-
-# 📊 Аналіз покупок за віковими групами
-st.subheader("📊 Покупки за віковими групами")
-st.markdown("""
-Ця візуалізація показує, які вікові групи витрачають найбільше онлайн. 
-Групи чітко визначені: 18–23, 24–29, ..., 72–77.
-Три найактивніші групи виділені різними відтінками синього, найменш активна — червоним.
-""")
-
-import pandas as pd
-import plotly.express as px
-
-if all(col in filtered_df.columns for col in ["Age", "Purchase Amount (USD)"]):
-    # 🔹 Чітко задані вікові межі
-    bins = [18, 24, 30, 36, 42, 48, 54, 60, 66, 72, 78]  # верхня межа +1
-    labels = [
-        "18–23", "24–29", "30–35", "36–41", "42–47",
-        "48–53", "54–59", "60–65", "66–71", "72–77"
-    ]
-
-    # 🔹 Створення вікових груп
-    filtered_df["Age Group"] = pd.cut(filtered_df["Age"], bins=bins, labels=labels, right=False)
-
-    # 🔹 Агрегація суми покупок
-    age_group_sum = (
-        filtered_df.groupby("Age Group", observed=True)["Purchase Amount (USD)"]
-        .sum()
-        .round(2)
-        .reset_index()
-        .dropna()
-    )
+    # 🔹 Як k-means сегменти співвідносяться з RFM-сегментами
+    st.plotly_chart(fig_rfm, use_container_width=True)
 
-    # 🔹 Сортування вікових груп у правильному порядку
-    age_group_sum["SortIndex"] = age_group_sum["Age Group"].apply(lambda x: labels.index(str(x)))
-    age_group_sum = age_group_sum.sort_values("SortIndex", ascending=True).drop(columns="SortIndex")
-
-    # 🔹 Визначення топ-3 і мінімальної групи
-    sorted_by_amount = age_group_sum.sort_values("Purchase Amount (USD)", ascending=False).reset_index(drop=True)
-    top1 = sorted_by_amount.loc[0, "Age Group"]
-    top2 = sorted_by_amount.loc[1, "Age Group"] if len(sorted_by_amount) > 1 else None
-    top3 = sorted_by_amount.loc[2, "Age Group"] if len(sorted_by_amount) > 2 else None
-    bottom = sorted_by_amount.loc[len(sorted_by_amount)-1, "Age Group"]
-
-    # 🔹 Призначення кольорів
-    def assign_color(group):
-        if group == top1:
-            return "darkblue"
-        elif group == top2:
-            return "blue"
-        elif group == top3:
-            return "lightblue"
-        elif group == bottom:
-            return "red"
-        else:
-            return "lightgray"
-
-    age_group_sum["Color"] = age_group_sum["Age Group"].apply(assign_color)
-
-    # 🔹 Побудова графіка
-    fig_age = px.bar(
-        age_group_sum,
-        x="Purchase Amount (USD)",
-        y="Age Group",
-        orientation="h",
-        color="Color",
-        color_discrete_map="identity",
-        text="Purchase Amount (USD)",
-        title="Загальна сума покупок за віковими групами"
-    )
 
-    fig_age.update_traces(textposition="outside")
-    fig_age.update_layout(
-        xaxis_title="Сума покупок (USD)",
-        yaxis_title="Вікова група",
-        yaxis=dict(categoryorder="array", categoryarray=labels),
-        showlegend=False,
-        font=dict(size=14),
-        plot_bgcolor="white",
-        paper_bgcolor="white"
-    )
+drill_sections()
 
-    st.plotly_chart(fig_age, use_container_width=True)
 
+# 🧠 Звіт про пам'ять (сесія і процес)
+with st.sidebar.expander("🧠 Пам'ять"):
+    rss = memory.process_rss()
+    st.write(f"Сесія: {ledger.total() / memory.MB:.1f} МБ (пік {ledger.peak / memory.MB:.1f} МБ)")
+    st.write(f"Спільні дані процесу: {memory.shared_bytes() / memory.MB:.1f} МБ")
+    st.write(f"Разом із сесіями ({memory.session_count()}): {memory.process_tracked_bytes() / memory.MB:.1f} МБ")
+    if rss is not None:
+        st.write(f"Процес (RSS): {rss / memory.MB:.1f} МБ")
+    if ledger.sampled:
+        st.warning(f"Режим вибірки: показано {len(df)} рядків через обмеження пам'яті.")
+    st.dataframe(ledger.report(), hide_index=True)
@@ -0,0 +1,429 @@
+# 📏 Навантажувальний тест дашборду: скільки одночасних користувачів витримує один сервер Streamlit
+#
+# Запуск:  python benchmark.py --rows 3900 100000 --users 1 2 4 8 --iterations 3
+#
+# Для кожного розміру синтетичного набору даних і кожного рівня одночасності N
+# запускається один сервер `streamlit run app.py`, до якого підключаються N headless-клієнтів
+# через той самий websocket-протокол, що й браузер. Клієнти одночасно відкривають дашборд,
+# а після спільного бар'єра проходять сценарій взаємодії (фільтри, metric / heatmap_metric,
+# TOP_N, деталізація кліком по TreeMap). Віджети всередині фрагментів надсилаються з їхнім
+# fragment_id, тож сервер перезапускає лише фрагмент — як у браузері.
+# Звіт: p50/p95/p99 затримки загалом і для кожного типу кроку, пропускна здатність і пам'ять сервера.
+#
+# Потрібен пакет websockets (входить до залежностей streamlit >= 1.60).
+import argparse
+import contextlib
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+
+import numpy as np
+import pandas as pd
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+from websockets.sync.client import connect
+
+import memory
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(BASE_DIR, "app.py")
+SOURCE_DATA = os.path.join(BASE_DIR, "shopping_behavior_csv.csv")
+PORT = 8765
+
+METRIC_LABEL = "Оберіть метрику для аналізу:"
+HEATMAP_METRIC_LABEL = "Оберіть метрику для теплової карти:"
+TOP_N_LABEL = "Оберіть кількість товарів (Top / Bottom)"
+CATEGORY_LABEL = "Категорія"
+GENDER_LABEL = "Стать"
+RESET_DRILL_LABEL = "✖ Скинути деталізацію"
+
+# Пік пам'яті сесії з бічної панелі «🧠 Пам'ять»
+SESSION_PEAK = re.compile(r"^Сесія: .*\(пік ([\d.]+) МБ\)")
+
+WIDGET_TYPES = {"radio", "slider", "multiselect", "button", "button_group", "plotly_chart"}
+
+
+# ==============================
+# СИНТЕТИЧНІ ДАНІ
+# ==============================
+
+def make_dataset(rows, path, seed=0):
+    """Набір потрібного розміру: рядки оригіналу з поверненням, нові Customer ID і числові ознаки."""
+    rng = np.random.default_rng(seed)
+    source = pd.read_csv(SOURCE_DATA)
+    data = source.iloc[rng.integers(0, len(source), rows)].reset_index(drop=True)
+    data["Customer ID"] = np.arange(1, rows + 1)
+    data["Age"] = rng.integers(18, 71, rows)
+    data["Purchase Amount (USD)"] = rng.integers(20, 101, rows)
+    data["Previous Purchases"] = rng.integers(1, 51, rows)
+    data.to_csv(path, index=False)
+
+
+# ==============================
+# HEADLESS-КЛІЄНТ
+# ==============================
+
+class Client:
+    """Одна сесія браузера: надсилає стани віджетів і чекає кінця прогону скрипту."""
+
+    def __init__(self, port, timeout):
+        self.timeout = timeout
+        self.ws = connect(
+            f"ws://localhost:{port}/_stcore/stream", subprotocols=["streamlit"],
+            max_size=None, open_timeout=timeout
+        )
+        self.states = {}    # id віджета → WidgetState, як їх надсилає браузер
+        self.widgets = {}   # (тип, підпис) → (елемент, fragment_id)
+        self.session_peak = None
+
+    def __enter__(self):
+        self.ws.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.ws.__exit__(*exc_info)
+
+    def rerun(self, fragment_id=""):
+        """Прогін скрипту (або лише фрагмента); повертає затримку до script_finished у секундах."""
+        msg = BackMsg()
+        msg.rerun_script.query_string = ""
+        msg.rerun_script.page_script_hash = ""
+        msg.rerun_script.fragment_id = fragment_id
+        msg.rerun_script.widget_states.widgets.extend(self.states.values())
+        started = time.perf_counter()
+        self.ws.send(msg.SerializeToString())
+        # Кнопка натискається один раз: trigger_value не повторюємо в наступних прогонах
+        self.states = {
+            widget_id: state for widget_id, state in self.states.items()
+            if state.WhichOneof("value") != "trigger_value"
+        }
+        while True:
+            forward = ForwardMsg()
+            forward.ParseFromString(self.ws.recv(timeout=self.timeout))
+            kind = forward.WhichOneof("type")
+            if kind == "delta" and forward.delta.WhichOneof("type") == "new_element":
+                self.on_element(forward.delta.new_element, forward.delta.fragment_id)
+            elif kind == "script_finished":
+                if forward.script_finished == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                    raise RuntimeError("помилка компіляції app.py")
+                return time.perf_counter() - started
+
+    def on_element(self, element, fragment_id):
+        kind = element.WhichOneof("type")
+        if kind == "exception":
+            raise RuntimeError(element.exception.message)
+        if kind == "markdown":
+            match = SESSION_PEAK.match(element.markdown.body)
+            if match:
+                peak = float(match.group(1)) * memory.MB
+                self.session_peak = max(self.session_peak or 0, peak)
+        elif kind in WIDGET_TYPES:
+            proto = getattr(element, kind)
+            # У графіків немає підпису — розрізняємо їх за типом першого сліду (treemap, sankey, ...)
+            label = json.loads(proto.spec)["data"][0]["type"] if kind == "plotly_chart" else proto.label
+            self.widgets[(kind, label)] = (proto, fragment_id)
+
+    def widget(self, kind, label):
+        if (kind, label) not in self.widgets:
+            raise RuntimeError(f"на сторінці немає віджета {kind} «{label}»")
+        return self.widgets[(kind, label)]
+
+    def set_state(self, proto, **value):
+        self.states[proto.id] = WidgetState(id=proto.id, **value)
+
+    def radio_value(self, proto):
+        state = self.states.get(proto.id)
+        return state.string_value if state else proto.options[proto.default]
+
+
+# ==============================
+# СЦЕНАРІЙ КОРИСТУВАЧА
+# ==============================
+# Кожен крок змінює стан віджета й повертає fragment_id прогону ("" — повний прогін)
+
+def filter_category(client, rng):
+    proto, fragment_id = client.widget("multiselect", CATEGORY_LABEL)
+    options = list(proto.options)
+    client.set_state(proto, string_array_value={"data": rng.sample(options, rng.randint(1, len(options)))})
+    return fragment_id
+
+
+def filter_gender(client, rng):
+    proto, fragment_id = client.widget("multiselect", GENDER_LABEL)
+    client.set_state(proto, string_array_value={"data": [rng.choice(list(proto.options))]})
+    return fragment_id
+
+
+def clear_filters(client, rng):
+    for label in (CATEGORY_LABEL, GENDER_LABEL):
+        proto, fragment_id = client.widget("multiselect", label)
+        client.set_state(proto, string_array_value={"data": list(proto.options)})
+    return fragment_id
+
+
+def switch_radio(client, label):
+    proto, fragment_id = client.widget("radio", label)
+    current = client.radio_value(proto)
+    client.set_state(proto, string_value=next(option for option in proto.options if option != current))
+    return fragment_id
+
+
+def switch_metric(client, rng):
+    return switch_radio(client, METRIC_LABEL)
+
+
+def switch_heatmap_metric(client, rng):
+    return switch_radio(client, HEATMAP_METRIC_LABEL)
+
+
+def move_top_n(client, rng):
+    proto, fragment_id = client.widget("slider", TOP_N_LABEL)
+    client.set_state(proto, double_array_value={"data": [rng.randint(3, 10)]})
+    return fragment_id
+
+
+def drill_category(client, rng):
+    # Клік по плитці TreeMap: точка у форматі, який надсилає фронтенд Streamlit
+    proto, fragment_id = client.widget("plotly_chart", "treemap")
+    labels = json.loads(proto.spec)["data"][0]["labels"]
+    index = rng.randrange(len(labels))
+    point = {"label": labels[index], "id": labels[index], "parent": "", "pointNumber": index}
+    selection = {"selection": {"points": [point], "point_indices": [index], "box": [], "lasso": []}}
+    client.set_state(proto, string_value=json.dumps(selection))
+    return fragment_id
+
+
+def clear_drill(client, rng):
+    proto, fragment_id = client.widget("button", RESET_DRILL_LABEL)
+    client.set_state(proto, trigger_value=True)
+    # Після скидання графіки отримують нові ключі — старе виділення браузер більше не надсилає
+    treemap, _ = client.widget("plotly_chart", "treemap")
+    client.states.pop(treemap.id, None)
+    return fragment_id
+
+
+SCENARIO = [
+    switch_metric, move_top_n, filter_category, switch_heatmap_metric,
+    drill_category, clear_drill, filter_gender, move_top_n, clear_filters, switch_metric,
+]
+
+
+def run_user(port, user, args, barrier, outcomes):
+    """Відкриття дашборду, спільний старт і сценарій одного користувача (у власному потоці)."""
+    rng = random.Random(user)
+    latencies, errors, client = [], [], None
+    with contextlib.ExitStack() as stack:
+        try:
+            client = stack.enter_context(Client(port, args.timeout))
+            latencies.append(("open", False, client.rerun()))
+        except Exception as exc:
+            errors.append(f"user {user}: {exc}")
+        # Сценарій стартує, лише коли відкрились усі — інакше відкриття одних накладається на кроки інших
+        barrier.wait()
+        if not errors:
+            try:
+                for step in SCENARIO * args.iterations:
+                    fragment_id = step(client, rng)
+                    latencies.append((step.__name__, bool(fragment_id), client.rerun(fragment_id)))
+            except Exception as exc:  # звітуємо, але не зупиняємо інших користувачів
+                errors.append(f"user {user}: {exc}")
+    outcomes[user] = {
+        "finished": time.perf_counter(),
+        "latencies": latencies,
+        "session_peak": client.session_peak if client else None,
+        "errors": errors,
+    }
+
+
+# ==============================
+# СЕРВЕР І КООРДИНАТОР
+# ==============================
+
+def start_server(port, data_path, snapshot_path, log, timeout):
+    env = dict(os.environ, DASHBOARD_DATA_PATH=data_path, DASHBOARD_SNAPSHOT_PATH=snapshot_path)
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "streamlit", "run", APP_PATH,
+            "--server.headless=true", f"--server.port={port}",
+            "--browser.gatherUsageStats=false", "--server.fileWatcherType=none",
+        ],
+        env=env, cwd=BASE_DIR, stdout=log, stderr=subprocess.STDOUT
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            break
+        try:
+            with urllib.request.urlopen(f"http://localhost:{port}/_stcore/health", timeout=1):
+                return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    log.seek(0)
+    raise RuntimeError(f"сервер Streamlit не запустився:\n{log.read()[-2000:]}")
+
+
+def sample_rss(pid, stop, samples, interval=0.05):
+    while not stop.is_set():
+        rss = memory.process_rss(pid)
+        if rss is not None:
+            samples.append(rss)
+        stop.wait(interval)
+
+
+def percentiles(values):
+    if not values:
+        return {"n": 0, "p50": None, "p95": None, "p99": None}
+    return {
+        "n": len(values),
+        "p50": float(np.percentile(values, 50)),
+        "p95": float(np.percentile(values, 95)),
+        "p99": float(np.percentile(values, 99)),
+    }
+
+
+def run_level(rows, users, data_path, snapshot_path, args):
+    """Окремий сервер на рівень: N клієнтів відкривають дашборд і проходять сценарій одночасно."""
+    with tempfile.TemporaryFile(mode="w+") as log:
+        server = start_server(args.port, data_path, snapshot_path, log, args.timeout)
+        try:
+            # Прогрів: імпорти й спільні кеші сервера (дані, знімок, моделі сегментів) не рахуються на користувачів
+            with Client(args.port, args.timeout) as warmup:
+                warmup.rerun()
+            rss_before = memory.process_rss(server.pid)
+
+            rss_samples, stop = [], threading.Event()
+            sampler = threading.Thread(target=sample_rss, args=(server.pid, stop, rss_samples), daemon=True)
+            sampler.start()
+            started = []
+            barrier = threading.Barrier(users, action=lambda: started.append(time.perf_counter()))
+            outcomes = [None] * users
+            threads = [
+                threading.Thread(target=run_user, args=(args.port, user, args, barrier, outcomes))
+                for user in range(users)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            stop.set()
+            sampler.join()
+        finally:
+            server.kill()
+            server.wait()
+
+    latencies = [item for outcome in outcomes for item in outcome["latencies"]]
+    wall = max(o["finished"] for o in outcomes) - started[0]
+    steps, fragment_steps = {}, set()
+    for step, fragment, seconds in latencies:
+        steps.setdefault(step, []).append(seconds)
+        if fragment:
+            fragment_steps.add(step)
+    # Пропускна здатність рахується з тих самих прогонів сценарію, що й колонка «прогонів» (без відкриття)
+    reruns = percentiles([seconds for step, _, seconds in latencies if step != "open"])
+    rss_peak = max(rss_samples, default=None)
+    return {
+        "rows": rows,
+        "users": users,
+        "reruns": reruns["n"],
+        "wall": wall,
+        "throughput": reruns["n"] / wall if wall else 0.0,
+        "p50": reruns["p50"],
+        "p95": reruns["p95"],
+        "p99": reruns["p99"],
+        "open_p50": percentiles(steps.get("open", []))["p50"],
+        "steps": {
+            step: dict(percentiles(values), fragment=step in fragment_steps) for step, values in steps.items()
+        },
+        "rss_before": rss_before,
+        "rss_peak": rss_peak,
+        "rss_per_user": (rss_peak - rss_before) / users if rss_peak and rss_before else None,
+        "session_peak": max((o["session_peak"] for o in outcomes if o["session_peak"]), default=None),
+        "errors": [error for o in outcomes for error in o["errors"]],
+    }
+
+
+def mb(value):
+    return f"{value / memory.MB:.1f}" if value is not None else "—"
+
+
+def ms(value):
+    return f"{value * 1000:.0f}" if value is not None else "—"
+
+
+def print_report(results):
+    header = (
+        f"{'рядків':>9} {'корист.':>7} {'прогонів':>8} {'прог./с':>8} {'p50, мс':>8} {'p95, мс':>8} "
+        f"{'p99, мс':>8} {'відкр., мс':>10} {'RSS сервера, МБ':>15} {'пік RSS, МБ':>11} "
+        f"{'ΔRSS/корист., МБ':>16} {'пік сесії, МБ':>13}"
+    )
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r['rows']:>9} {r['users']:>7} {r['reruns']:>8} {r['throughput']:>8.2f} {ms(r['p50']):>8} "
+            f"{ms(r['p95']):>8} {ms(r['p99']):>8} {ms(r['open_p50']):>10} {mb(r['rss_before']):>15} "
+            f"{mb(r['rss_peak']):>11} {mb(r['rss_per_user']):>16} {mb(r['session_peak']):>13}"
+        )
+        for error in r["errors"]:
+            print(f"    ⚠️ {error}")
+
+    # Затримка за типом кроку: дешеві кроки фрагмента не ховаються за дорогими фільтрами
+    print()
+    header = f"{'рядків':>9} {'корист.':>7} {'крок':<24} {'n':>4} {'p50, мс':>8} {'p95, мс':>8} {'p99, мс':>8}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        for step, stats in r["steps"].items():
+            name = f"{step} *" if stats["fragment"] else step
+            print(
+                f"{r['rows']:>9} {r['users']:>7} {name:<24} {stats['n']:>4} "
+                f"{ms(stats['p50']):>8} {ms(stats['p95']):>8} {ms(stats['p99']):>8}"
+            )
+
+    print()
+    print("* перезапуск лише фрагмента дашборду, як у браузері.")
+    print("RSS сервера — після прогріву одним відкриттям; ΔRSS/корист. — (пік RSS − RSS сервера) / користувачів.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Навантажувальний тест дашборду: один сервер Streamlit, N клієнтів")
+    parser.add_argument("--rows", type=int, nargs="+", default=[3900], help="розміри синтетичних наборів даних")
+    parser.add_argument("--users", type=int, nargs="+", default=[1, 2, 4, 8], help="рівні одночасності")
+    parser.add_argument("--iterations", type=int, default=2, help="скільки разів кожен користувач проходить сценарій")
+    parser.add_argument("--timeout", type=float, default=300, help="таймаут запуску сервера й одного прогону, с")
+    parser.add_argument("--port", type=int, default=PORT, help="порт сервера Streamlit на час тесту")
+    parser.add_argument("--json", help="зберегти результати у JSON-файл")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            data_path = os.path.join(tmp, f"shopping_{rows}.csv")
+            snapshot_path = os.path.join(tmp, f"default_view_{rows}.pkl")
+            make_dataset(rows, data_path)
+            # Знімок вигляду за замовчуванням збирається заздалегідь, як у розгортанні
+            subprocess.run(
+                [sys.executable, os.path.join(BASE_DIR, "snapshot.py"), "--data", data_path, "--out", snapshot_path],
+                check=True, capture_output=True
+            )
+            for users in args.users:
+                print(f"▶ {rows} рядків, {users} корист. ...", file=sys.stderr)
+                results.append(run_level(rows, users, data_path, snapshot_path, args))
+
+    print_report(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,388 @@
+# 🎨 Побудова графіків дашборду (без Streamlit — використовується і в app.py, і в snapshot.py)
+import colorsys
+import io
+
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import seaborn as sns
+from matplotlib.figure import Figure
+
+import analytics
+
+# 🔹 Координати центрів штатів (спрощено)
+STATE_COORDS = {
+    "CA": [-119.4179, 36.7783], "TX": [-99.9018, 31.9686], "NY": [-75.4999, 43.0000],
+    "FL": [-81.5158, 27.6648], "IL": [-89.3985, 40.6331], "PA": [-77.1945, 41.2033],
+    "OH": [-82.9071, 40.4173], "GA": [-82.9071, 32.1656], "NC": [-79.0193, 35.7596],
+    "MI": [-85.6024, 44.3148], "NJ": [-74.4057, 40.0583], "VA": [-78.6569, 37.4316],
+    "WA": [-120.7401, 47.7511], "AZ": [-111.0937, 34.0489], "MA": [-71.3824, 42.4072],
+    "TN": [-86.5804, 35.5175], "IN": [-86.1349, 40.2672], "MO": [-91.8318, 37.9643],
+    "WI": [-89.6165, 43.7844], "CO": [-105.7821, 39.5501], "MN": [-94.6859, 46.7296],
+    "SC": [-81.1637, 33.8361], "AL": [-86.9023, 32.3182], "LA": [-91.9623, 30.9843],
+    "KY": [-84.2700, 37.8393], "OR": [-120.5542, 43.8041], "OK": [-97.0929, 35.0078],
+    "CT": [-72.7554, 41.6032], "IA": [-93.0977, 41.8780], "MS": [-89.3985, 32.3547],
+    "AR": [-92.3731, 35.2010], "KS": [-98.4842, 39.0119], "UT": [-111.0937, 39.3200],
+    "NV": [-116.4194, 38.8026], "NM": [-105.8701, 34.5199], "NE": [-99.9018, 41.4925],
+    "WV": [-80.4549, 38.5976], "ID": [-114.7420, 44.0682], "HI": [-155.5828, 19.8968],
+    "NH": [-71.5724, 43.1939], "ME": [-69.4455, 45.2538], "RI": [-71.4774, 41.5801],
+    "MT": [-110.3626, 46.8797], "DE": [-75.5277, 38.9108], "SD": [-99.9018, 43.9695],
+    "ND": [-101.0020, 47.5515], "VT": [-72.5778, 44.5588], "AK": [-149.4937, 64.2008],
+    "WY": [-107.2903, 43.0759]
+}
+
+
+def png_bytes(fig):
+    """PNG з тими самими параметрами, що й у st.pyplot (bbox_inches="tight", dpi=200)."""
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", bbox_inches="tight", dpi=200)
+    return buffer.getvalue()
+
+
+# 🌳 TreeMap: покупки по категоріях
+def treemap_figure(df_treemap):
+    fig_tree = px.treemap(
+        df_treemap,
+        path=["Label"],
+        values="Count",
+        color="Count",
+        color_continuous_scale="Blues",
+        title="TreeMap: Покупки по категоріях"
+    )
+
+    # 🔹 Зміна розміру шрифту
+    fig_tree.update_traces(
+        insidetextfont=dict(size=16)  # Можеш змінити на 20, 24 тощо
+    )
+    return fig_tree
+
+
+# 🔥 Теплова карта взаємозв’язків (Cramér’s V)
+# Figure без pyplot: не чіпає глобальний стан matplotlib, тож безпечна для паралельних сесій
+def correlation_heatmap_png(corr_matrix):
+    fig = Figure(figsize=(12, 9))
+    ax = fig.subplots()
+    sns.heatmap(
+        corr_matrix.astype(float),
+        annot=True,
+        cmap="YlGnBu",
+        linewidths=0.5,
+        fmt=".2f",
+        annot_kws={"size": 8},
+        ax=ax
+    )
+    ax.set_title("Взаємозв’язки між змінними (Cramér’s V)", fontsize=14)
+    ax.tick_params(axis="x", labelrotation=45, labelsize=8)
+    for label in ax.get_xticklabels():
+        label.set_horizontalalignment("right")
+    ax.tick_params(axis="y", labelsize=8)
+    fig.tight_layout()
+    return png_bytes(fig)
+
+
+# 🔀 Sankey Diagram: Gender → Category → Season
+def sankey_figure(sankey_df):
+    # 🔹 Унікальні мітки для вузлів
+    all_labels = pd.concat([sankey_df["Gender"], sankey_df["Category"], sankey_df["Season"]]).unique().tolist()
+    label_to_index = {label: i for i, label in enumerate(all_labels)}
+
+    # 🔹 Потоки: Gender → Category
+    source_gc = sankey_df["Gender"].map(label_to_index)
+    target_gc = sankey_df["Category"].map(label_to_index)
+    value_gc = sankey_df["count"]
+
+    # 🔹 Потоки: Category → Season
+    source_cs = sankey_df["Category"].map(label_to_index)
+    target_cs = sankey_df["Season"].map(label_to_index)
+    value_cs = sankey_df["count"]
+
+    # 🔹 Об'єднання всіх потоків
+    all_source = source_gc.tolist() + source_cs.tolist()
+    all_target = target_gc.tolist() + target_cs.tolist()
+    all_value = value_gc.tolist() + value_cs.tolist()
+
+    # 🔹 Індивідуальне призначення кольорів для потоків
+    all_color = []
+    for s, t in zip(all_source, all_target):
+        src_label = all_labels[s]
+        tgt_label = all_labels[t]
+
+        # Світло-голубий — найбільш помітні потоки
+        if (src_label == "Female" and tgt_label == "Accessories") or \
+           (src_label == "Accessories" and tgt_label == "Summer") or \
+           (src_label == "Male" and tgt_label == "Clothing") or \
+           (src_label == "Clothing" and tgt_label == "Fall"):
+            all_color.append("rgba(173,216,230,0.6)")
+
+        # Світло-жовтий — сезонний зв’язок
+        elif (src_label == "Accessories" and tgt_label == "Summer") or \
+             (src_label == "Clothing" and tgt_label == "Winter"):
+            all_color.append("rgba(255,255,153,0.6)")
+
+        # Світло-червоний — несподівано малий потік
+        elif (src_label == "Female" and tgt_label == "Footwear") or \
+             (src_label == "Footwear" and tgt_label == "Spring" and "Female" in sankey_df["Gender"].unique()):
+            all_color.append("rgba(255,182,193,0.6)")
+
+        # Інші — напівпрозорі
+        else:
+            all_color.append("rgba(150,150,150,0.3)")
+
+    # 🔹 Генерація кольорів вузлів
+    def generate_colors(n):
+        hues = [i / n for i in range(n)]
+        return [
+            f"rgba({int(r*255)}, {int(g*255)}, {int(b*255)}, 0.9)"
+            for h in hues
+            for r, g, b in [colorsys.hsv_to_rgb(h, 0.5, 0.9)]
+        ][:n]
+
+    node_colors = generate_colors(len(all_labels))
+
+    # 🔹 Побудова Sankey Diagram
+    fig3 = go.Figure(data=[go.Sankey(
+        node=dict(
+            pad=20,
+            thickness=25,
+            line=dict(color="black", width=0.8),
+            label=all_labels,
+            color=node_colors,
+            hoverlabel=dict(
+                bgcolor="white",
+                font_size=14,
+                font_color="black"
+            )
+        ),
+        link=dict(
+            source=all_source,
+            target=all_target,
+            value=all_value,
+            color=all_color
+        )
+    )])
+
+    # 🔹 Стиль діаграми
+    fig3.update_layout(
+        title=dict(
+            text="Sankey Diagram: Gender → Category → Season",
+            font=dict(size=18, color="black"),
+            x=0.5
+        ),
+        font=dict(color="black", size=15),
+        plot_bgcolor="white",
+        paper_bgcolor="white"
+    )
+    return fig3
+
+
+# 🧍‍♂️🧍‍♀️ TOP / BOTTOM товарів за статтю
+def top_bottom_figures(grouped, metric, top_n):
+    value_label = "Number of Purchases" if metric == analytics.METRIC_COUNT else "Total Purchase Amount (USD)"
+
+    # Загальне значення по кожному товару (для сортування)
+    total_by_item = (
+        grouped
+        .groupby("Item Purchased")["Value"]
+        .sum()
+        .sort_values(ascending=False)
+    )
+
+    # TOP і BOTTOM списки товарів
+    top_items = total_by_item.head(top_n)
+    bottom_items = total_by_item.tail(top_n)
+
+    top_data = grouped[grouped["Item Purchased"].isin(top_items.index)]
+    bottom_data = grouped[grouped["Item Purchased"].isin(bottom_items.index)]
+
+    # ==============================
+    # ВІЗУАЛІЗАЦІЯ: TOP (↓ спадання)
+    # ==============================
+
+    fig_top = px.bar(
+        top_data,
+        x="Item Purchased",
+        y="Value",
+        color="Gender",
+        barmode="group",
+        title=f"Top {top_n} товарів за показником: {metric}",
+        labels={
+            "Value": value_label,
+            "Item Purchased": "Товар",
+            "Gender": "Стать"
+        }
+    )
+
+    # Сортування осі X від більшого до меншого
+    fig_top.update_layout(
+        xaxis=dict(
+            categoryorder="array",
+            categoryarray=top_items.index.tolist()
+        ),
+        xaxis_tickangle=-45,
+        template="plotly_white"
+    )
+
+    # ==============================
+    # ВІЗУАЛІЗАЦІЯ: BOTTOM (↑ зростання)
+    # ==============================
+
+    fig_bottom = px.bar(
+        bottom_data,
+        x="Item Purchased",
+        y="Value",
+        color="Gender",
+        barmode="group",
+        title=f"Bottom {top_n} товарів за показником: {metric}",
+        labels={
+            "Value": value_label,
+            "Item Purchased": "Товар",
+            "Gender": "Стать"
+        }
+    )
+
+    # Сортування осі X від меншого до більшого
+    fig_bottom.update_layout(
+        xaxis=dict(
+            categoryorder="array",
+            categoryarray=bottom_items.sort_values().index.tolist()
+        ),
+        xaxis_tickangle=-45,
+        template="plotly_white"
+    )
+    return fig_top, fig_bottom
+
+
+# 🔥 Heatmap: Товар × Стать
+def gender_item_heatmap_png(heatmap_pivot, metric):
+    fig = Figure(figsize=(6, max(6, len(heatmap_pivot) * 0.4)))
+    ax = fig.subplots()
+
+    sns.heatmap(
+        heatmap_pivot,
+        annot=True,
+        fmt=".0f",
+        cmap="YlOrRd",
+        linewidths=0.5,
+        cbar_kws={"label": metric},
+        ax=ax
+    )
+
+    ax.set_title("Heatmap: Стать × Товар", fontsize=14)
+    ax.set_xlabel("Стать")
+    ax.set_ylabel("Товар")
+
+    fig.tight_layout()
+    return png_bytes(fig)
+
+
+# 🗺️ Сума покупок по штатах США
+def location_map_figure(location_sum):
+    fig_map = go.Figure()
+
+    # 🔸 Хлороплет
+    fig_map.add_trace(go.Choropleth(
+        locations=location_sum["State"],
+        z=location_sum["Total Purchase"],
+        locationmode="USA-states",
+        colorscale="YlOrRd",
+        colorbar_title="Сума покупок ($)",
+        marker_line_color="white"
+    ))
+
+    # 🔸 Текстові підписи
+    for i, row in location_sum.iterrows():
+        code = row["State"]
+        if code in STATE_COORDS:
+            lon, lat = STATE_COORDS[code]
+            fig_map.add_trace(go.Scattergeo(
+                locationmode="USA-states",
+                lon=[lon],
+                lat=[lat],
+                text=code,
+                mode="text",
+                showlegend=False,
+                textfont=dict(color="black", size=10)
+            ))
+
+    # 🔹 Оформлення
+    fig_map.update_layout(
+        title_text="Сума покупок по штатах США",
+        geo=dict(scope="usa", projection=go.layout.geo.Projection(type="albers usa")),
+        margin=dict(l=0, r=0, t=50, b=0)
+    )
+    return fig_map
+
+
+# 📊 Сума покупок за віковими групами
+def age_group_figure(age_group_sum):
+    age_group_sum = age_group_sum.copy()
+    labels = analytics.AGE_LABELS
+
+    # 🔹 Визначення топ-3 і мінімальної групи
+    sorted_by_amount = age_group_sum.sort_values("Purchase Amount (USD)", ascending=False).reset_index(drop=True)
+    top1 = sorted_by_amount.loc[0, "Age Group"]
+    top2 = sorted_by_amount.loc[1, "Age Group"] if len(sorted_by_amount) > 1 else None
+    top3 = sorted_by_amount.loc[2, "Age Group"] if len(sorted_by_amount) > 2 else None
+    bottom = sorted_by_amount.loc[len(sorted_by_amount)-1, "Age Group"]
+
+    # 🔹 Призначення кольорів
+    def assign_color(group):
+        if group == top1:
+            return "darkblue"
+        elif group == top2:
+            return "blue"
+        elif group == top3:
+            return "lightblue"
+        elif group == bottom:
+            return "red"
+        else:
+            return "lightgray"
+
+    age_group_sum["Color"] = age_group_sum["Age Group"].apply(assign_color)
+
+    # 🔹 Побудова графіка
+    fig_age = px.bar(
+        age_group_sum,
+        x="Purchase Amount (USD)",
+        y="Age Group",
+        orientation="h",
+        color="Color",
+        color_discrete_map="identity",
+        text="Purchase Amount (USD)",
+        title="Загальна сума покупок за віковими групами"
+    )
+
+    fig_age.update_traces(textposition="outside")
+    fig_age.update_layout(
+        xaxis_title="Сума покупок (USD)",
+        yaxis_title="Вікова група",
+        yaxis=dict(categoryorder="array", categoryarray=labels),
+        showlegend=False,
+        font=dict(size=14),
+        plot_bgcolor="white",
+        paper_bgcolor="white"
+    )
+    return fig_age
+
+
+# 👤 Сегменти клієнтів: кількість і зв’язок із RFM-сегментами
+def segment_figures(segment_profile, rfm_crosstab):
+    fig_segments = px.bar(
+        segment_profile.reset_index(),
+        x="Segment",
+        y="Клієнтів",
+        color="Segment",
+        text="Клієнтів",
+        title="Кількість клієнтів у сегментах"
+    )
+    fig_segments.update_layout(xaxis_title="Сегмент", showlegend=False, template="plotly_white")
+
+    # 🔹 Як k-means сегменти співвідносяться з RFM-сегментами
+    fig_rfm = px.imshow(
+        rfm_crosstab,
+        text_auto=True,
+        color_continuous_scale="Blues",
+        labels=dict(x="RFM-сегмент", y="Сегмент", color="Клієнтів"),
+        title="Сегменти k-means × RFM-сегменти"
+    )
+    return fig_segments, fig_rfm
@@ -0,0 +1,172 @@
+# 🧠 Облік пам'яті дашборду: по сесіях і по процесу
+import gc
+import os
+import sys
+import threading
+import time
+import weakref
+
+import pandas as pd
+
+MB = 1024 * 1024
+
+# 🔹 Бюджети пам'яті (МБ), задаються змінними оточення
+PROCESS_BUDGET_ENV = "DASHBOARD_MEMORY_BUDGET_MB"
+SESSION_BUDGET_ENV = "DASHBOARD_SESSION_BUDGET_MB"
+DEFAULT_PROCESS_BUDGET_MB = 1024
+DEFAULT_SESSION_BUDGET_MB = 256
+
+# 🔹 Гістерезис виселення: повторне очищення кешів не частіше ніж раз на EVICTION_COOLDOWN_S,
+# а режим деградації знімається лише коли RSS опуститься нижче LOW_WATERMARK × бюджет
+EVICTION_COOLDOWN_S = 60
+LOW_WATERMARK = 0.8
+
+
+def budget_mb(env_name, default):
+    """Повертає бюджет у байтах зі змінної оточення або значення за замовчуванням."""
+    try:
+        value = float(os.environ.get(env_name, default))
+    except ValueError:
+        value = default
+    return int(value * MB)
+
+
+def object_bytes(obj):
+    """Оцінка розміру структури даних у байтах (для DataFrame/Series — deep)."""
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if hasattr(obj, "nbytes"):
+        return int(obj.nbytes)
+    return sys.getsizeof(obj)
+
+
+def process_rss(pid=None):
+    """Поточний RSS процесу (свого або `pid`) в байтах; None, якщо його не можна прочитати (немає /proc).
+
+    Пік RSS тут не підходить: він лише зростає, тож бюджет спрацьовував би назавжди.
+    """
+    try:
+        with open(f"/proc/{pid or 'self'}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def peak_rss():
+    """Пік RSS процесу в байтах; None на платформах без модуля resource."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS повертає байти, Linux — кілобайти
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+# 🔹 Усі живі журнали сесій процесу (для сумарного обліку)
+_ledgers = weakref.WeakSet()
+
+# 🔹 Структури, спільні для всіх сесій процесу (рахуються один раз)
+_shared = {}
+
+
+class MemoryLedger:
+    """Журнал пам'яті однієї сесії: розміри структур поточного прогону і пік."""
+
+    def __init__(self):
+        self.entries = {}
+        self.peak = 0
+        self.sampled = False
+        _ledgers.add(self)
+
+    def start_run(self):
+        self.entries = {}
+
+    def track(self, name, obj):
+        self.record(name, object_bytes(obj))
+        return obj
+
+    def record(self, name, nbytes):
+        self.entries[name] = int(nbytes)
+        self.peak = max(self.peak, self.total())
+
+    def total(self):
+        return sum(self.entries.values())
+
+    def report(self):
+        return (
+            pd.DataFrame({"Структура": list(self.entries), "МБ": [b / MB for b in self.entries.values()]})
+            .sort_values("МБ", ascending=False)
+            .reset_index(drop=True)
+        )
+
+
+def register_shared(name, nbytes):
+    _shared[name] = int(nbytes)
+
+
+def unregister_shared(name):
+    """Прибирає спільну структуру з обліку; повертає True, якщо вона була зареєстрована."""
+    return _shared.pop(name, None) is not None
+
+
+def shared_bytes():
+    return sum(_shared.values())
+
+
+def process_tracked_bytes():
+    """Сумарна пам'ять структур даних процесу: спільні один раз плюс усі активні сесії."""
+    return shared_bytes() + sum(ledger.total() for ledger in list(_ledgers))
+
+
+def session_count():
+    return len(_ledgers)
+
+
+_eviction_lock = threading.Lock()
+_last_eviction = None
+_degraded = False
+
+
+def enforce_process_budget(evict, budget=None):
+    """Контроль бюджету процесу з гістерезисом; повертає True у режимі деградації (вибірки).
+
+    Понад бюджетом викликає `evict()` (очищення кешів) і GC, але не частіше ніж раз
+    на EVICTION_COOLDOWN_S — RSS після GC рідко одразу падає, і без паузи кожен
+    перезапуск кожної сесії знову очищав би спільні кеші. Деградація вмикається,
+    якщо після очищення процес усе ще понад бюджетом, і вимикається лише нижче
+    LOW_WATERMARK × бюджет.
+    """
+    global _last_eviction, _degraded
+    budget = budget_mb(PROCESS_BUDGET_ENV, DEFAULT_PROCESS_BUDGET_MB) if budget is None else budget
+    rss = process_rss()
+    if rss is None:
+        return False
+    with _eviction_lock:
+        if rss < budget * LOW_WATERMARK:
+            _degraded = False
+        elif rss > budget:
+            now = time.monotonic()
+            if _last_eviction is None or now - _last_eviction >= EVICTION_COOLDOWN_S:
+                _last_eviction = now
+                evict()
+                gc.collect()
+                rss = process_rss()
+                _degraded = rss is not None and rss > budget
+        return _degraded
+
+
+def sample_to_budget(df, budget, nbytes=None, reserve=4):
+    """Зменшує DataFrame випадковою вибіркою так, щоб сесія вклалась у бюджет.
+
+    `nbytes` — уже відомий розмір df (deep-оцінка дорога на об'єктних колонках);
+    `reserve` — скільки копій розміру даних закладаємо на проміжні структури сесії.
+    Виклик дорогий, тому результат варто кешувати за (версія даних, бюджет).
+    """
+    needed = (object_bytes(df) if nbytes is None else nbytes) * reserve
+    if needed <= budget or df.empty:
+        return df, False
+    frac = max(budget / needed, 1 / len(df))
+    return df.sample(frac=frac, random_state=0).sort_index(), True
@@ -0,0 +1,109 @@
+# 👤 Сегментація клієнтів: RFM-скоринг і k-means на рівні Customer ID
+import numpy as np
+import pandas as pd
+from sklearn.cluster import MiniBatchKMeans
+
+# 🔹 Частота покупок → кількість покупок на рік
+FREQUENCY_PER_YEAR = {
+    "Weekly": 52, "Bi-Weekly": 26, "Fortnightly": 26, "Monthly": 12,
+    "Quarterly": 4, "Every 3 Months": 4, "Annually": 1,
+}
+
+FEATURES = ["Age", "Purchase Amount (USD)", "Previous Purchases", "Purchases per Year"]
+
+# 🔹 Назви k-means сегментів у порядку спадання середнього RFM-балу
+CLUSTER_NAMES = ["💎 Найцінніші", "🔁 Лояльні", "🌱 Перспективні", "💤 Пасивні"]
+
+# 🔹 RFM-сегменти за сумою балів (3–15): нижня межа → назва
+RFM_SEGMENTS = [(12, "Чемпіони"), (9, "Лояльні"), (6, "Потребують уваги"), (0, "Під ризиком")]
+
+FIT_SAMPLE = 200_000     # скільки клієнтів достатньо для навчання центроїдів
+BATCH_SIZE = 4096        # розмір міні-батчу k-means
+PREDICT_CHUNK = 500_000  # призначення сегментів порціями, щоб обмежити пікову пам'ять
+
+
+def customer_features(df):
+    """Один рядок на клієнта: векторизовані числові ознаки."""
+    # Лише потрібні колонки: assign на всьому df скопіював би й усі об'єктні колонки
+    features = df[["Customer ID", "Age", "Purchase Amount (USD)", "Previous Purchases"]].assign(**{
+        "Purchases per Year": df["Frequency of Purchases"].map(FREQUENCY_PER_YEAR).astype(float)
+    })
+    customers = (
+        features
+        .groupby("Customer ID", sort=False)
+        .agg({
+            "Age": "last",
+            "Purchase Amount (USD)": "sum",
+            "Previous Purchases": "max",
+            "Purchases per Year": "max",
+        })
+    )
+    return customers.fillna({"Purchases per Year": customers["Purchases per Year"].median()})
+
+
+def quantile_score(values, q=5):
+    # Ранг розбиває рівні значення, тож квантилі завжди мають q непорожніх кошиків
+    return pd.qcut(values.rank(method="first"), q, labels=False) + 1
+
+
+def rfm_scores(customers, q=5):
+    """RFM-бали 1..q. Дата останньої покупки відсутня, тому R — частота покупок як її проксі."""
+    scores = pd.DataFrame({
+        "R": quantile_score(customers["Purchases per Year"], q),
+        "F": quantile_score(customers["Previous Purchases"], q),
+        "M": quantile_score(customers["Purchase Amount (USD)"], q),
+    }, index=customers.index)
+    scores["RFM Score"] = scores[["R", "F", "M"]].sum(axis=1)
+    bounds = [low for low, _ in reversed(RFM_SEGMENTS)] + [np.inf]
+    names = [name for _, name in reversed(RFM_SEGMENTS)]
+    scores["RFM Segment"] = pd.cut(scores["RFM Score"], bins=bounds, labels=names, right=False)
+    return scores
+
+
+def fit_kmeans(customers, n_clusters=len(CLUSTER_NAMES), random_state=0):
+    """Навчає MiniBatchKMeans на стандартизованих ознаках (на вибірці для великих наборів)."""
+    X = customers[FEATURES].to_numpy(dtype=np.float32)
+    mean, std = X.mean(axis=0), X.std(axis=0)
+    std[std == 0] = 1
+    if len(X) > FIT_SAMPLE:
+        X = X[np.random.default_rng(random_state).choice(len(X), FIT_SAMPLE, replace=False)]
+    model = MiniBatchKMeans(
+        n_clusters=n_clusters, batch_size=BATCH_SIZE, n_init=3, random_state=random_state
+    ).fit((X - mean) / std)
+    return {"model": model, "mean": mean, "std": std}
+
+
+def predict_clusters(fitted, customers):
+    X = customers[FEATURES].to_numpy(dtype=np.float32)
+    labels = np.empty(len(X), dtype=np.int32)
+    for start in range(0, len(X), PREDICT_CHUNK):
+        chunk = X[start:start + PREDICT_CHUNK]
+        labels[start:start + PREDICT_CHUNK] = fitted["model"].predict((chunk - fitted["mean"]) / fitted["std"])
+    return labels
+
+
+def segment_customers(df):
+    """Ознаки, RFM-бали та k-means сегмент для кожного клієнта (індекс — Customer ID)."""
+    customers = customer_features(df)
+    customers = customers.join(rfm_scores(customers))
+    clusters = predict_clusters(fit_kmeans(customers), customers)
+
+    # Кластери називаємо за спаданням середнього RFM-балу
+    order = pd.Series(customers["RFM Score"].to_numpy()).groupby(clusters).mean().sort_values(ascending=False).index
+    rank = np.zeros(len(CLUSTER_NAMES), dtype=np.int32)
+    rank[order] = np.arange(len(order))
+    customers["Segment"] = pd.Categorical.from_codes(rank[clusters], categories=CLUSTER_NAMES)
+    return customers
+
+
+def segment_profile(customers):
+    """Середні ознаки й кількість клієнтів по кожному сегменту."""
+    profile = customers.groupby("Segment", observed=True)[FEATURES + ["RFM Score"]].mean().round(1)
+    profile.insert(0, "Клієнтів", customers["Segment"].value_counts())
+    return profile
+
+
+def segment_summary(customers, data):
+    """Профіль сегментів і таблиця k-means × RFM серед клієнтів, що є в `data`."""
+    segment_view = customers[customers.index.isin(data["Customer ID"])]
+    return segment_profile(segment_view), pd.crosstab(segment_view["Segment"], segment_view["RFM Segment"])
@@ -0,0 +1,151 @@
+# 📸 Знімок вигляду за замовчуванням (усі фільтри, метрики й TOP_N — як при першому відкритті)
+#
+# Збірка:  python snapshot.py [--data shopping_behavior_csv.csv] [--out default_view.pkl]
+# Знімок містить і агрегати секцій, і вже відрендерені графіки (PNG теплових карт,
+# JSON фігур plotly): поки фільтри не змінено, app.py нічого не рахує й не рендерить.
+# Знімок прив’язаний до відбитка набору даних, коду секцій і версій бібліотек
+# і вважається застарілим, щойно змінюється будь-що з них.
+import argparse
+import hashlib
+import os
+import pickle
+from importlib.metadata import PackageNotFoundError, version
+
+import analytics
+import charts
+import segments
+
+SNAPSHOT_PATH = os.environ.get(
+    "DASHBOARD_SNAPSHOT_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "default_view.pkl")
+)
+SNAPSHOT_FORMAT = 2
+
+# 🔹 Від чого залежить вміст знімка, окрім даних: код секцій і графіків та бібліотеки,
+# які їх рахують, рендерять і серіалізують (pickle чужої версії pandas може не прочитатись)
+CODE_MODULES = [analytics, charts, segments]
+LIBRARIES = ["pandas", "numpy", "scipy", "scikit-learn", "matplotlib", "seaborn", "plotly"]
+
+
+def dataset_fingerprint(path=analytics.DATA_PATH):
+    """SHA-256 вмісту файлу даних."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def code_fingerprint():
+    """SHA-256 коду секцій і графіків разом із версіями бібліотек."""
+    digest = hashlib.sha256()
+    for module in CODE_MODULES:
+        with open(module.__file__, "rb") as f:
+            digest.update(f.read())
+    for library in LIBRARIES:
+        try:
+            digest.update(f"{library}=={version(library)}".encode())
+        except PackageNotFoundError:
+            digest.update(f"{library}==?".encode())
+    return digest.hexdigest()
+
+
+def snapshot_fingerprint(data_path=analytics.DATA_PATH):
+    return f"{dataset_fingerprint(data_path)}:{code_fingerprint()}"
+
+
+def compute_sections(df):
+    """Виходи всіх секцій для нефільтрованих даних і віджетів за замовчуванням."""
+    return {
+        "treemap": analytics.category_treemap(df),
+        "gender_shares": analytics.gender_shares(df),
+        "corr_matrix": analytics.correlation_matrix(df),
+        "sankey": analytics.sankey_counts(df),
+        "gender_item": analytics.gender_item_values(df, analytics.METRIC_COUNT),
+        "heatmap_pivot": analytics.gender_item_pivot(df, analytics.METRIC_COUNT),
+        "location_sum": analytics.location_totals(df),
+        "age_group_sum": analytics.age_group_totals(df),
+        "segment_summary": segments.segment_summary(segments.segment_customers(df), df),
+    }
+
+
+def render_sections(sections):
+    """Відрендерені графіки вигляду за замовчуванням: PNG теплових карт і JSON фігур plotly."""
+    fig_top, fig_bottom = charts.top_bottom_figures(
+        sections["gender_item"], analytics.METRIC_COUNT, analytics.DEFAULT_TOP_N
+    )
+    fig_segments, fig_rfm = charts.segment_figures(*sections["segment_summary"])
+    figures = {
+        "treemap": charts.treemap_figure(sections["treemap"]),
+        "sankey": charts.sankey_figure(sections["sankey"]),
+        "top": fig_top,
+        "bottom": fig_bottom,
+        "location_sum": charts.location_map_figure(sections["location_sum"]),
+        "age_group_sum": charts.age_group_figure(sections["age_group_sum"]),
+        "segments": fig_segments,
+        "rfm": fig_rfm,
+    }
+    return {
+        "figures": {name: fig.to_json() for name, fig in figures.items()},
+        "images": {
+            "corr_matrix": charts.correlation_heatmap_png(sections["corr_matrix"]),
+            "heatmap_pivot": charts.gender_item_heatmap_png(sections["heatmap_pivot"], analytics.METRIC_COUNT),
+        },
+    }
+
+
+def build_view(df):
+    """Увесь вигляд за замовчуванням: {"sections": ..., "figures": ..., "images": ...}."""
+    sections = compute_sections(df)
+    return {"sections": sections, **render_sections(sections)}
+
+
+def save_snapshot(view, fingerprint, path=SNAPSHOT_PATH):
+    # Запис через тимчасовий файл, щоб паралельні сесії не прочитали недописаний знімок
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump({"format": SNAPSHOT_FORMAT, "fingerprint": fingerprint, "view": view}, f)
+    os.replace(tmp_path, path)
+
+
+def load_snapshot(fingerprint, path=SNAPSHOT_PATH):
+    """Вигляд зі знімка або None, якщо файлу немає, він пошкоджений чи зібраний для інших даних або коду."""
+    try:
+        with open(path, "rb") as f:
+            snapshot = pickle.load(f)
+        if snapshot["format"] != SNAPSHOT_FORMAT or snapshot["fingerprint"] != fingerprint:
+            return None
+        return snapshot["view"]
+    except Exception:
+        # Знімок іншої версії pandas/numpy падає на розпакуванні чим завгодно (ModuleNotFoundError,
+        # AttributeError, TypeError, ...) — це привід перебудувати, а не зламати сесію
+        return None
+
+
+def load_or_build(data_path=analytics.DATA_PATH, path=SNAPSHOT_PATH):
+    """Повертає актуальний вигляд, за потреби перебудовуючи й зберігаючи знімок."""
+    fingerprint = snapshot_fingerprint(data_path)
+    view = load_snapshot(fingerprint, path)
+    if view is None:
+        view = build_view(analytics.read_dataset(data_path))
+        try:
+            save_snapshot(view, fingerprint, path)
+        except OSError:
+            # Файлова система лише для читання — знімок житиме тільки в пам’яті процесу
+            pass
+    return view
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Збірка знімка вигляду за замовчуванням")
+    parser.add_argument("--data", default=analytics.DATA_PATH, help="шлях до CSV з даними")
+    parser.add_argument("--out", default=SNAPSHOT_PATH, help="куди записати знімок")
+    args = parser.parse_args()
+
+    fingerprint = snapshot_fingerprint(args.data)
+    save_snapshot(build_view(analytics.read_dataset(args.data)), fingerprint, args.out)
+    print(f"Знімок записано: {args.out} (дані {fingerprint[:12]}, код {fingerprint.split(':')[1][:12]})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# 🧪 Розбір виділення на графіках: точки записано з st.session_state[<ключ>].selection.points
+import pandas as pd
+
+import analytics
+
+TREEMAP_POINT = {
+    "curveNumber": 0, "pointNumber": 2, "pointIndex": 2,
+    "label": "Footwear<br>15.4%", "id": "Footwear<br>15.4%", "parent": "", "value": 599,
+}
+CHOROPLETH_POINT = {
+    "curveNumber": 0, "pointNumber": 12, "pointIndex": 12,
+    "location": "KY", "z": 4402, "ct": [-85.3, 37.5],
+}
+SCATTERGEO_POINT = {
+    "curveNumber": 1, "pointNumber": 12, "pointIndex": 12,
+    "lon": -85.3, "lat": 37.5, "text": "KY",
+}
+
+
+def test_treemap_point():
+    assert analytics.treemap_drill(TREEMAP_POINT) == {"Category": "Footwear"}
+
+
+def test_choropleth_point():
+    assert analytics.map_drill(CHOROPLETH_POINT) == {"Location": "Kentucky"}
+
+
+def test_scattergeo_label_point():
+    assert analytics.map_drill(SCATTERGEO_POINT) == {"Location": "Kentucky"}
+
+
+def test_unknown_points():
+    assert analytics.treemap_drill({}) == {}
+    assert analytics.map_drill({}) == {}
+    assert analytics.map_drill({"location": "XX"}) == {}
+
+
+def test_apply_drill():
+    data = pd.DataFrame({
+        "Category": ["Footwear", "Clothing", "Footwear"],
+        "Location": ["Kentucky", "Kentucky", "Alaska"],
+    })
+    assert analytics.apply_drill(data, ()) is data
+    drilled = analytics.apply_drill(data, (("Category", "Footwear"), ("Location", "Kentucky")))
+    assert drilled.index.tolist() == [0]
+    assert analytics.apply_drill(data, (("Location", "Texas"),)).empty
+
+
+def test_correlation_matrix_skips_single_value_columns():
+    data = pd.DataFrame({
+        "Gender": ["Female"] * 6,
+        "Category": ["Footwear", "Clothing", "Footwear", "Clothing", "Footwear", "Clothing"],
+        "Season": ["Fall", "Fall", "Spring", "Spring", "Fall", "Spring"],
+    })
+    corr = analytics.correlation_matrix(data, ("Gender", "Category", "Season"))
+    assert corr.index.tolist() == ["Category", "Season"]
+    assert not corr.isna().any().any()
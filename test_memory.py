@@ -0,0 +1,109 @@
+# 🧪 Бюджет пам'яті: гістерезис і пауза виселення, вибірка в межах бюджету
+import pandas as pd
+import pytest
+
+import memory
+
+BUDGET = 100 * memory.MB
+
+
+@pytest.fixture
+def process(monkeypatch):
+    """Керований процес: RSS і годинник задаються тестом, стан модуля — чистий."""
+    state = {"rss": 0, "now": 1000.0, "evictions": 0, "rss_after_evict": None}
+
+    def evict():
+        state["evictions"] += 1
+        if state["rss_after_evict"] is not None:
+            state["rss"] = state["rss_after_evict"]
+
+    monkeypatch.setattr(memory, "process_rss", lambda: state["rss"])
+    monkeypatch.setattr(memory.time, "monotonic", lambda: state["now"])
+    monkeypatch.setattr(memory, "_last_eviction", None)
+    monkeypatch.setattr(memory, "_degraded", False)
+    state["evict"] = evict
+    return state
+
+
+def enforce(process):
+    return memory.enforce_process_budget(process["evict"], budget=BUDGET)
+
+
+def test_under_budget_does_nothing(process):
+    process["rss"] = 50 * memory.MB
+    assert enforce(process) is False
+    assert process["evictions"] == 0
+
+
+def test_eviction_that_frees_memory_does_not_degrade(process):
+    process["rss"] = 120 * memory.MB
+    process["rss_after_evict"] = 60 * memory.MB
+    assert enforce(process) is False
+    assert process["evictions"] == 1
+
+
+def test_degrades_when_eviction_does_not_help(process):
+    process["rss"] = 120 * memory.MB
+    assert enforce(process) is True
+    assert process["evictions"] == 1
+
+
+def test_cooldown_between_evictions(process):
+    process["rss"] = 120 * memory.MB
+    for _ in range(5):
+        assert enforce(process) is True
+    assert process["evictions"] == 1
+
+    process["now"] += memory.EVICTION_COOLDOWN_S
+    assert enforce(process) is True
+    assert process["evictions"] == 2
+
+
+def test_hysteresis_between_watermark_and_budget(process):
+    process["rss"] = 120 * memory.MB
+    assert enforce(process) is True
+
+    # Між нижньою межею і бюджетом режим деградації зберігається
+    process["rss"] = 90 * memory.MB
+    assert enforce(process) is True
+
+    process["rss"] = int(BUDGET * memory.LOW_WATERMARK) - 1
+    assert enforce(process) is False
+    assert process["evictions"] == 1
+
+
+def test_unknown_rss_never_degrades(process, monkeypatch):
+    monkeypatch.setattr(memory, "process_rss", lambda: None)
+    assert enforce(process) is False
+    assert process["evictions"] == 0
+
+
+def test_sample_to_budget_keeps_small_frame():
+    df = pd.DataFrame({"x": range(100)})
+    sampled, is_sampled = memory.sample_to_budget(df, BUDGET)
+    assert sampled is df
+    assert is_sampled is False
+
+
+def test_sample_to_budget_shrinks_large_frame():
+    df = pd.DataFrame({"x": range(1000)})
+    nbytes = 1000 * memory.MB
+    sampled, is_sampled = memory.sample_to_budget(df, BUDGET, nbytes=nbytes, reserve=4)
+    assert is_sampled is True
+    # Частка рядків = бюджет / (розмір × reserve), порядок рядків зберігається
+    assert len(sampled) == 25
+    assert sampled.index.is_monotonic_increasing
+    assert set(sampled.index) <= set(df.index)
+
+
+def test_sample_to_budget_keeps_at_least_one_row():
+    df = pd.DataFrame({"x": range(10)})
+    sampled, is_sampled = memory.sample_to_budget(df, 1, nbytes=10 * memory.MB)
+    assert is_sampled is True
+    assert len(sampled) == 1
+
+
+def test_unregister_shared():
+    memory.register_shared("test_sample", 10)
+    assert memory.unregister_shared("test_sample") is True
+    assert memory.unregister_shared("test_sample") is False
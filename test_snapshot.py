@@ -0,0 +1,59 @@
+# 🧪 Знімок вигляду за замовчуванням: застарілий чи нечитабельний знімок перебудовується, а не ламає сесію
+import pickle
+import types
+
+import snapshot
+
+FINGERPRINT = "data:code"
+
+
+def write(path, payload):
+    with open(path, "wb") as f:
+        f.write(payload)
+    return str(path)
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "view.pkl")
+    view = {"sections": {"gender_shares": (50.0, 50.0)}, "figures": {}, "images": {}}
+    snapshot.save_snapshot(view, FINGERPRINT, path)
+    assert snapshot.load_snapshot(FINGERPRINT, path) == view
+
+
+def test_other_fingerprint_or_format(tmp_path):
+    path = str(tmp_path / "view.pkl")
+    snapshot.save_snapshot({}, FINGERPRINT, path)
+    assert snapshot.load_snapshot("data:other-code", path) is None
+
+    payload = {"format": snapshot.SNAPSHOT_FORMAT - 1, "fingerprint": FINGERPRINT, "sections": {}}
+    assert snapshot.load_snapshot(FINGERPRINT, write(tmp_path / "old.pkl", pickle.dumps(payload))) is None
+
+
+def test_missing_or_corrupt_file(tmp_path):
+    assert snapshot.load_snapshot(FINGERPRINT, str(tmp_path / "missing.pkl")) is None
+    assert snapshot.load_snapshot(FINGERPRINT, write(tmp_path / "empty.pkl", b"")) is None
+    assert snapshot.load_snapshot(FINGERPRINT, write(tmp_path / "junk.pkl", b"not a pickle")) is None
+
+
+def test_pickle_from_other_library_versions(tmp_path):
+    # Класи, яких немає в поточних версіях бібліотек: ModuleNotFoundError і AttributeError при розпакуванні
+    missing_module = b"cpandas._libs.no_such_module\nBlock\n."
+    missing_class = b"cpandas\nNoSuchFrameClass\n."
+    assert snapshot.load_snapshot(FINGERPRINT, write(tmp_path / "module.pkl", missing_module)) is None
+    assert snapshot.load_snapshot(FINGERPRINT, write(tmp_path / "class.pkl", missing_class)) is None
+    # Не словник на верхньому рівні
+    assert snapshot.load_snapshot(FINGERPRINT, write(tmp_path / "list.pkl", pickle.dumps([1, 2]))) is None
+
+
+def test_code_fingerprint_tracks_code_and_libraries(tmp_path, monkeypatch):
+    module = types.SimpleNamespace(__file__=write(tmp_path / "sections.py", b"def section(): return 1\n"))
+    monkeypatch.setattr(snapshot, "CODE_MODULES", [module])
+    before = snapshot.code_fingerprint()
+    assert snapshot.code_fingerprint() == before
+
+    write(tmp_path / "sections.py", b"def section(): return 2\n")
+    changed_code = snapshot.code_fingerprint()
+    assert changed_code != before
+
+    monkeypatch.setattr(snapshot, "LIBRARIES", snapshot.LIBRARIES + ["streamlit"])
+    assert snapshot.code_fingerprint() != changed_code